@@ -1,13 +1,75 @@
+import csv
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, suppress
+import numpy as np
 import pandas as pd
 import requests
 import json
-from io import StringIO
+from io import BytesIO, StringIO
 from datetime import datetime, timedelta
 from catboost import CatBoostRegressor
 
+log = logging.getLogger(__name__)
+
 URL_SCRAPE = "https://raw.githubusercontent.com/NguyenJimmyT/webscraperSenior/refs/heads/main/parking_data.csv"
 URL_FILTER = "https://raw.githubusercontent.com/NguyenJimmyT/TitanRush/refs/heads/main/backend/Spring%26Fall2025.csv"
 
+CAT_FEATURES = ['structure', 'day_of_week', 'month', 'week_sem']
+NUM_FEATURES = ['half_hour', 'avg_hh']
+FEATURE_COLS = CAT_FEATURES + NUM_FEATURES
+FORECAST_DAYS = 14
+FORECAST_DIR = "forecast"
+
+DATA_DIR = os.getenv("TITANRUSH_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+STORE_DIR = os.path.join(DATA_DIR, "parking")
+CHECKPOINT_PATH = os.path.join(DATA_DIR, "ingest_checkpoint.json")
+FEATURES_DIR = os.path.join(DATA_DIR, "features")
+FEATURES_STATE_PATH = os.path.join(DATA_DIR, "features_state.json")
+FEATURE_TABLE_COLS = ['structure', 'date', 'levels', 'current_struc_avail', 'total_struc_avail', 'percentage_full',
+                      'sem_count', 'sem_start', 'week_sem', 'day_of_week', 'month', 'half_hour']
+# scraped rows are kept for these windows only, as in filter_csv
+SEMESTERS = [
+    ("2025-spring", pd.Timestamp("2025-01-21 00:00:00"), pd.Timestamp("2025-05-22 23:59:59")),
+    ("2025-fall", pd.Timestamp("2025-08-01 00:00:00"), None),
+]
+# lastUpdated as the scraper writes it; rows in any other format are parsed one by one
+LAST_UPDATED_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+CHUNK_BYTES = 8 << 20
+
+MODEL_PARAMS = dict(
+    depth=10,
+    learning_rate=0.02,
+    iterations=2000,
+    loss_function="RMSE",
+    l2_leaf_reg=5,
+    random_seed=42,
+    verbose=False,
+    allow_writing_files=False
+)
+# the refresh job publishes versioned forecasts here for the API servers to pick up
+PUBLISH_DIR = os.path.join(DATA_DIR, "forecast")
+KEEP_VERSIONS = 3
+REFRESH_INTERVAL = float(os.getenv("FORECAST_REFRESH_INTERVAL", "3600"))
+MODEL_PATH = os.path.join(DATA_DIR, "model.cbm")
+REPORT_PATH = os.path.join(DATA_DIR, "training_runs.jsonl")
+# the most recent days are held out to pick the iteration count; 0 trains on everything for MODEL_PARAMS["iterations"]
+HOLDOUT_DAYS = int(os.getenv("TRAIN_HOLDOUT_DAYS", "7"))
+EARLY_STOPPING_ROUNDS = 100
+# -1 lets CatBoost use every core
+THREAD_COUNT = int(os.getenv("TRAIN_THREADS", "-1"))
+# continue from the saved model when the data only gained newer rows
+WARM_START = os.getenv("TRAIN_WARM_START", "1") == "1"
+# refit on every row for the best iteration count, so the served model has seen the held-out
+# days forecast_days() predicts from; 0 serves the early-stopped model and saves the second fit
+REFIT = os.getenv("TRAIN_REFIT", "1") == "1"
+WARM_ITERATIONS = 300
+
 def filter_csv():
     response = requests.get(URL_SCRAPE)
     parse = pd.read_csv(StringIO(response.text))
@@ -28,10 +90,144 @@ def filter_csv():
     filtered.to_csv("Spring&Fall2025.csv", index=False)
     return {"message": "filtered CSV created"}
 
-def createModel():
-    response = requests.get(URL_FILTER)
-    dataset = pd.read_csv(StringIO(response.text))
-    
+def parse_last_updated(values):
+    parsed = pd.to_datetime(values, format=LAST_UPDATED_FORMAT, errors="coerce")
+    odd = parsed.isna() & values.notna()
+    if odd.any():
+        parsed[odd] = pd.to_datetime(values[odd], format="mixed", errors="coerce")
+    return parsed
+
+def semester_of(stamps):
+    semester = pd.Series(None, index=stamps.index, dtype=object)
+    for name, start, end in SEMESTERS:
+        inside = (stamps >= start) & (stamps <= (end if end is not None else pd.Timestamp.now()))
+        semester[inside] = name
+    return semester
+
+def read_checkpoint(path=CHECKPOINT_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+@contextmanager
+def replacing(path):
+    """
+    Yields a temporary path next to `path` to write to. When the block
+    finishes the file replaces `path` in one rename; when it raises, the
+    temporary file is removed and `path` is left as it was.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp)
+        raise
+
+def replace_file(path, data):
+    with replacing(path) as tmp, open(tmp, "wb") as f:
+        f.write(data)
+
+def write_checkpoint(state, path=CHECKPOINT_PATH):
+    replace_file(path, json.dumps(state).encode())
+
+def line_blocks(stream, start, size=CHUNK_BYTES):
+    """(offset, bytes) blocks of whole lines; an unterminated last line is left for the next run."""
+    pending = b""
+    offset = start
+    while True:
+        data = stream.read(size)
+        if not data:
+            break
+        pending += data
+        cut = pending.rfind(b"\n") + 1
+        if cut:
+            yield offset, pending[:cut]
+            offset += cut
+            pending = pending[cut:]
+
+def fetch_scrape(url, start=0):
+    # identity encoding so byte ranges refer to the file itself
+    headers = {"Accept-Encoding": "identity"}
+    if start:
+        headers["Range"] = f"bytes={start}-"
+    response = requests.get(url, headers=headers, stream=True, timeout=(5, 60))
+    response.raise_for_status()
+    return response
+
+def ingest(url=URL_SCRAPE, store=STORE_DIR, checkpoint_path=CHECKPOINT_PATH):
+    """
+    Appends scraper rows not seen by earlier runs to the Parquet store,
+    partitioned by semester and day.
+
+    The checkpoint keeps the byte offset reached in the CSV and the last
+    line before it. A run asks only for the bytes after that line (HTTP
+    Range) and checks the line is still there; if the file was rewritten
+    or the server ignores the range, the whole file is read again and only
+    rows newer than the last ingested timestamp are kept. Part files are
+    named by generation and offset, so re-running after a crash rewrites
+    the same files instead of duplicating rows.
+    """
+    state = read_checkpoint(checkpoint_path)
+    response = None
+    if state.get("offset"):
+        tail = state["tail"].encode()
+        response = fetch_scrape(url, state["offset"] - len(tail))
+        if response.status_code != 206 or response.raw.read(len(tail)) != tail:
+            response.close()
+            response = None
+    if response is not None:
+        start, since = state["offset"], None
+    else:
+        response = fetch_scrape(url)
+        header_line = response.raw.readline()
+        start = len(header_line)
+        since = pd.Timestamp(state["last_timestamp"]) if state.get("last_timestamp") else None
+        state = {
+            "generation": state.get("generation", -1) + 1,
+            "columns": next(csv.reader([header_line.decode()])),
+            "last_timestamp": state.get("last_timestamp"),
+            "rows": state.get("rows", 0),
+        }
+    added = 0
+    with response:
+        for offset, block in line_blocks(response.raw, start):
+            chunk = pd.read_csv(BytesIO(block), names=state["columns"], header=None, dtype=str)
+            chunk["lastUpdated"] = chunk["lastUpdated"].str.strip()
+            chunk["datetime"] = parse_last_updated(chunk["lastUpdated"])
+            chunk["semester"] = semester_of(chunk["datetime"])
+            keep = chunk["semester"].notna()
+            if since is not None:
+                keep &= chunk["datetime"] > since
+            chunk = chunk[keep].copy()
+            if len(chunk):
+                chunk["total"] = pd.to_numeric(chunk["total"], errors="coerce")
+                chunk["day"] = chunk["datetime"].dt.strftime("%Y-%m-%d")
+                chunk.to_parquet(
+                    store, partition_cols=["semester", "day"], index=False,
+                    basename_template=f"part-{state['generation']:04d}-{offset:012d}-{{i}}.parquet",
+                    existing_data_behavior="overwrite_or_ignore",
+                )
+                last = chunk["datetime"].max()
+                if state["last_timestamp"] is None or last > pd.Timestamp(state["last_timestamp"]):
+                    state["last_timestamp"] = last.isoformat()
+                added += len(chunk)
+                state["rows"] += len(chunk)
+            state["offset"] = offset + len(block)
+            state["tail"] = block[block.rfind(b"\n", 0, len(block) - 1) + 1:].decode()
+            write_checkpoint(state, checkpoint_path)
+    return {"message": f"{added} rows ingested", "rows": state.get("rows", 0), "last_timestamp": state.get("last_timestamp")}
+
+def clean_scrape(raw):
+    """Scrape rows with names normalized and dates localized, one row per (timestamp, level)."""
+    dataset = raw.copy()
     dataset['structure'] = dataset['structure'].str.title()
     dataset['level'] = dataset['level'].str.title()
     dataset['structure'] = dataset['structure'].replace({"Lot A & G": "LotA&G", "S8 And S10": "LotA&G"})
@@ -39,78 +235,372 @@ def createModel():
     dataset = dataset[dataset['structure'] != 'Fullerton Free Church']
     dataset['date'] = pd.to_datetime(dataset['date'], errors="coerce")
     dataset['date'] = dataset['date'].dt.tz_localize('US/Pacific')
-    dataset['time'] = dataset['date'].dt.strftime('%H:%M:%S')
+    dataset = dataset[dataset['date'].notna()]
     dataset = dataset.drop_duplicates(subset=['date', 'level'])
-    dataset['gap'] = dataset['date'].diff().dt.days
-    dataset['sem_count'] = (dataset['gap'] > 30).cumsum()
-    dataset['sem_start'] = dataset.groupby('sem_count')['date'].transform('min').dt.normalize()
-    dataset['week_sem'] = ((dataset['date'] - dataset['sem_start']).dt.days // 7 + 1)
     dataset['available'] = dataset['available'].replace('Full', 0).astype(int)
-    dataset['day_of_week'] = dataset['date'].dt.day_name()
-    dataset['hour'] = dataset['date'].dt.hour
-    dataset['minute'] = dataset['date'].dt.minute
-    dataset['half_hour'] = dataset['hour'] + (dataset['minute'] >= 30) * 0.5
-    dataset['current_struc_avail'] = dataset.groupby(['structure', 'date', 'time'])['available'].transform('sum')
-    dataset['total_struc_avail'] = dataset.groupby(['structure', 'date', 'time'])['total'].transform('sum')
-    dataset = dataset.sort_values(by=['date', 'time', 'level']).reset_index(drop=True)
-    dataset['percentage_full'] = (dataset['total_struc_avail'] - dataset['current_struc_avail']) / dataset['total_struc_avail']
-    dataset['month'] = dataset['date'].dt.month
-    dataset['avg_hh'] = (dataset.groupby(['structure', 'half_hour'])['current_struc_avail']).transform('mean')
-    dataset['week_sem'] = dataset['week_sem'].astype(str)
-    cat_feat = ['structure', 'day_of_week', 'month', 'week_sem']
-    num_feats = ['half_hour', 'avg_hh']
-    feat_cols = cat_feat + num_feats
-
-    model = CatBoostRegressor(
-        depth=10,
-        learning_rate=0.02,
-        iterations=2000,
-        loss_function="RMSE",
-        l2_leaf_reg=5,
-        random_seed=42,
-        verbose=False
-    )
-    
-    X_train = dataset[feat_cols]
-    y_train = dataset['current_struc_avail']
-    
-    model.fit(X_train, y_train, cat_features=[0, 1, 2, 3])
-
-    structure = dataset['structure'].unique()
-    today = pd.Timestamp.now().date()
+    return dataset
 
-    this_week = today - timedelta(days=today.weekday() + 1)
-    forecast_day = [this_week + timedelta(days=i) for i in range(14)]
-
-    overall_forecast = {}
-    for day in forecast_day:
-        curr = pd.Timestamp(day).tz_localize('US/Pacific')
-        dow = curr.day_name()
-        time = pd.date_range("00:00", "23:55", freq="5min").time
-        avg_hh = dataset.groupby(['structure', 'half_hour'])['avg_hh'].mean()
-        sem_start = dataset.groupby('sem_count')['sem_start'].max().max()
-        week_sem = str(max(1, ((curr.normalize() - sem_start).days // 7 + 1)))
-        rows = []
-        for i in time:
-            hh = i.hour + (i.minute >= 30) * 0.5
-            for s in structure:
-                rows.append({
-                    "structure": s,
-                    "day_of_week": dow,
-                    "month": curr.month,
-                    "week_sem": week_sem,
-                    "half_hour": hh,
-                    "time": i.strftime("%H:%M:%S"),
-                    "avg_hh": float(avg_hh.get((s, hh), 0))
-                })
-        pred = pd.DataFrame(rows)
-        pred["avail"] = model.predict(pred[feat_cols]).round().astype(int)
-        pivot = pred.pivot(index="time", columns="structure", values="avail")
-        
-        overall_forecast[str(day)] = pivot.to_dict(orient="index")
+def local_stamp(value):
+    return pd.Timestamp(value).tz_convert('US/Pacific')
+
+def structure_features(raw, state):
+    """
+    One feature row per (structure, timestamp) for the scrape rows in `raw`,
+    continuing from `state`: the last timestamp, semester count and start of
+    the batches before it, and the per-(structure, half-hour) sums behind
+    avg_hh. Returns the rows and the updated state; an empty state computes
+    everything from scratch.
+
+    `levels` is how many level rows the structure had at that timestamp,
+    i.e. how many training rows it stands for.
+    """
+    dataset = clean_scrape(raw)
+    if dataset.empty:
+        return pd.DataFrame(columns=FEATURE_TABLE_COLS), state
+    rows = (dataset.groupby(['structure', 'date'])
+            .agg(levels=('level', 'size'), current_struc_avail=('available', 'sum'), total_struc_avail=('total', 'sum'))
+            .reset_index())
+
+    # a gap of more than 30 days between scrapes starts a new semester
+    stamps = pd.Series(rows['date'].unique()).sort_values(ignore_index=True)
+    gaps = stamps.diff()
+    if state.get("last_date"):
+        gaps.iloc[0] = stamps.iloc[0] - local_stamp(state["last_date"])
+    sem_count = state.get("sem_count", 0) + (gaps.dt.days > 30).cumsum()
+    sem_start = stamps.groupby(sem_count).transform('min').dt.normalize()
+    if state.get("sem_start"):
+        sem_start[sem_count == state["sem_count"]] = local_stamp(state["sem_start"])
+    rows = rows.merge(pd.DataFrame({'date': stamps, 'sem_count': sem_count, 'sem_start': sem_start}), on='date')
+
+    rows['week_sem'] = ((rows['date'] - rows['sem_start']).dt.days // 7 + 1).astype(str)
+    rows['day_of_week'] = rows['date'].dt.day_name()
+    rows['month'] = rows['date'].dt.month
+    rows['half_hour'] = rows['date'].dt.hour + (rows['date'].dt.minute >= 30) * 0.5
+    rows['percentage_full'] = (rows['total_struc_avail'] - rows['current_struc_avail']) / rows['total_struc_avail']
+
+    sums = (rows.assign(total=rows['current_struc_avail'] * rows['levels'], count=rows['levels'])
+            .groupby(['structure', 'half_hour'], as_index=False)[['total', 'count']].sum())
+    if state.get("avg_hh"):
+        previous = pd.DataFrame(state["avg_hh"], columns=['structure', 'half_hour', 'total', 'count'])
+        sums = pd.concat([previous, sums]).groupby(['structure', 'half_hour'], as_index=False).sum()
+    state = {
+        "last_date": stamps.iloc[-1].isoformat(),
+        "sem_count": int(sem_count.iloc[-1]),
+        "sem_start": sem_start.iloc[-1].isoformat(),
+        "avg_hh": [[s, float(h), int(t), int(c)] for s, h, t, c in sums.itertuples(index=False)],
+    }
+    return rows[FEATURE_TABLE_COLS], state
+
+def training_rows(features, state):
+    """
+    The rows createModel trains on: each feature row repeated once per level,
+    as the per-level scrape rows were, with avg_hh from the running sums.
+    """
+    sums = pd.DataFrame(state["avg_hh"], columns=['structure', 'half_hour', 'total', 'count'])
+    sums['avg_hh'] = sums['total'] / sums['count']
+    features = features.reset_index(drop=True)
+    dataset = features.loc[features.index.repeat(features['levels'])]
+    dataset = dataset.merge(sums[['structure', 'half_hour', 'avg_hh']], on=['structure', 'half_hour'], how='left')
+    return dataset.sort_values(['date', 'structure'], kind='stable').reset_index(drop=True)
+
+def update_features(store=STORE_DIR, features_dir=FEATURES_DIR, state_path=FEATURES_STATE_PATH):
+    """
+    Adds feature rows for the scrapes ingested since the last call and folds
+    them into the running aggregates; returns the number of rows added. Only
+    the day partitions from the last featurized day on are read. The newest
+    scrape is held back until a later one arrives, since an ingest may have
+    stopped partway through its rows.
+    """
+    state = read_checkpoint(state_path)
+    filters = None
+    if state.get("last_date"):
+        last = local_stamp(state["last_date"]).tz_localize(None)
+        filters = [("day", ">=", str(last.date()))]
+    raw = pd.read_parquet(store, filters=filters).drop(columns=["semester", "day"])
+    if filters:
+        raw = raw[raw['datetime'] > last]
+    raw = raw[raw['datetime'] < raw['datetime'].max()].sort_values('datetime', kind='stable')
+    features, state = structure_features(raw, state)
+    if features.empty:
+        return 0
+    # named after the first scrape in the batch, so a batch redone after a crash replaces its own file
+    path = os.path.join(features_dir, f"part-{features['date'].min():%Y%m%dT%H%M%S}.parquet")
+    with replacing(path) as tmp:
+        features.to_parquet(tmp, index=False)
+    write_checkpoint(state, state_path)
+    return len(features)
+
+def load_features(features_dir=FEATURES_DIR, state_path=FEATURES_STATE_PATH):
+    return training_rows(pd.read_parquet(features_dir), read_checkpoint(state_path))
+
+def load_dataset():
+    if os.path.isdir(STORE_DIR):
+        update_features()
+        return load_features()
+    response = requests.get(URL_FILTER)
+    return training_rows(*structure_features(pd.read_csv(StringIO(response.text)), {}))
+
+def createModel():
+    dataset = load_dataset()
+
+    model, report = train_model(dataset)
+
+    overall_forecast = predict_forecast(model, dataset, forecast_days())
     with open("forecast.json", "w") as f:
         json.dump(overall_forecast, f, indent=4)
-    return {"message": "forecast CSV created"}
+    write_forecast_shards(overall_forecast)
+    return {"message": "forecast CSV created", "training": report}
+
+def saved_model(dataset, model_path=MODEL_PATH):
+    """
+    (model, metadata) of the previously saved model if it was trained with
+    the current parameters and features on data that `dataset` only
+    extends (the same rows up to its last timestamp, anything newer added)
+    and has room to grow; (None, None) otherwise.
+    """
+    try:
+        with open(model_path + ".json") as f:
+            meta = json.load(f)
+        if meta["params"] != MODEL_PARAMS or meta["features"] != FEATURE_COLS:
+            return None, None
+        if (dataset['date'] <= pd.Timestamp(meta["last_date"])).sum() != meta["rows"]:
+            return None, None
+        model = CatBoostRegressor()
+        model.load_model(model_path)
+    except (OSError, ValueError, KeyError):
+        return None, None
+    # continued boosting only adds trees; start over once it has doubled the budget
+    if model.tree_count_ + WARM_ITERATIONS > 2 * MODEL_PARAMS["iterations"]:
+        return None, None
+    return model, meta
+
+def save_model(model, trained, dataset, model_path=MODEL_PATH):
+    """Saves `model`, fit on `trained`, noting the whole `dataset` it was built from."""
+    with replacing(model_path) as tmp:
+        model.save_model(tmp)
+    meta = {
+        "params": MODEL_PARAMS, "features": FEATURE_COLS,
+        "last_date": trained['date'].max().isoformat(), "rows": len(trained),
+        "data_last_date": dataset['date'].max().isoformat(), "data_rows": len(dataset),
+    }
+    write_checkpoint(meta, model_path + ".json")
+
+def train_model(dataset, holdout_days=HOLDOUT_DAYS, thread_count=THREAD_COUNT, warm_start=WARM_START, refit=REFIT, model_path=MODEL_PATH, report_path=REPORT_PATH):
+    """
+    Fits the availability model and returns (model, report).
+
+    The last `holdout_days` of data are held out and training stops once
+    the hold-out error has not improved for EARLY_STOPPING_ROUNDS
+    iterations. With `refit`, the model is then fit again on all rows for
+    the best iteration count, so it has seen the most recent days; without
+    it, the early-stopped model is served and lags the data by the hold-out
+    window until a later run trains on those rows. With `warm_start`, a
+    compatible saved model is continued for at most WARM_ITERATIONS more
+    trees instead of starting over (and reused as is when no rows were
+    added). Each run's timings and hold-out accuracy are appended to
+    `report_path` as a JSON line.
+    """
+    started = time.perf_counter()
+    init, meta = saved_model(dataset, model_path) if warm_start else (None, None)
+    report = {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "mode": "warm" if init is not None else "cold",
+        "rows": len(dataset),
+        "thread_count": thread_count,
+    }
+    if init is not None and meta.get("data_rows") == len(dataset) and meta.get("data_last_date") == dataset['date'].max().isoformat():
+        report.update(mode="reuse", trees=int(init.tree_count_), total_seconds=round(time.perf_counter() - started, 2))
+        append_report(report, report_path)
+        return init, report
+    params = dict(MODEL_PARAMS, thread_count=thread_count)
+    cutoff = dataset['date'].max() - pd.Timedelta(days=holdout_days)
+    if init is not None:
+        params["iterations"] = WARM_ITERATIONS
+        # never validate on rows the saved model was trained on
+        cutoff = max(cutoff, pd.Timestamp(meta["last_date"]))
+    holdout = dataset['date'] > cutoff if holdout_days > 0 else pd.Series(False, index=dataset.index)
+    train, valid = dataset[~holdout], dataset[holdout]
+    report["holdout_rows"] = len(valid)
+    y = 'current_struc_avail'
+    if not (len(valid) and len(train)):
+        # nothing to hold out: a single fit on every row
+        train = dataset
+        model = CatBoostRegressor(**params)
+        model.fit(train[FEATURE_COLS], train[y], cat_features=[0, 1, 2, 3], init_model=init)
+    else:
+        model = CatBoostRegressor(**params, early_stopping_rounds=EARLY_STOPPING_ROUNDS, use_best_model=True)
+        model.fit(train[FEATURE_COLS], train[y], cat_features=[0, 1, 2, 3],
+                  eval_set=(valid[FEATURE_COLS], valid[y]), init_model=init)
+        error = model.predict(valid[FEATURE_COLS]) - valid[y].to_numpy()
+        report.update(
+            best_iteration=int(model.best_iteration_),
+            holdout_rmse=float(np.sqrt(np.mean(error ** 2))),
+            holdout_mae=float(np.mean(np.abs(error))),
+            # the half-hour average alone, for scale
+            baseline_mae=float(np.mean(np.abs(valid['avg_hh'].to_numpy() - valid[y].to_numpy()))),
+            fit_seconds=round(time.perf_counter() - started, 2),
+        )
+        if refit:
+            params["iterations"] = int(model.best_iteration_) + 1
+            train = dataset
+            model = CatBoostRegressor(**params)
+            model.fit(train[FEATURE_COLS], train[y], cat_features=[0, 1, 2, 3], init_model=init)
+    report["refit"] = train is dataset
+    save_model(model, train, dataset, model_path)
+    report.update(trees=int(model.tree_count_), total_seconds=round(time.perf_counter() - started, 2))
+    append_report(report, report_path)
+    return model, report
+
+def append_report(report, report_path=REPORT_PATH):
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, "a") as f:
+        f.write(json.dumps(report) + "\n")
+
+def forecast_days(today=None):
+    today = today or pd.Timestamp.now().date()
+    this_week = today - timedelta(days=today.weekday() + 1)
+    return [this_week + timedelta(days=i) for i in range(FORECAST_DAYS)]
+
+def forecast_frame(dataset, days):
+    """
+    Feature rows for every (day, 5-minute slot, structure), ordered that way.
+    The per-structure half-hour means and the semester start are taken from
+    `dataset` once for all days.
+    """
+    structures = dataset['structure'].unique()
+    avg_hh = dataset.groupby(['structure', 'half_hour'])['avg_hh'].mean()
+    sem_start = dataset.groupby('sem_count')['sem_start'].max().max()
+    slots = pd.date_range("00:00", "23:55", freq="5min")
+    day_ts = pd.DatetimeIndex([pd.Timestamp(day) for day in days]).tz_localize('US/Pacific')
+    week_sem = np.maximum(1, (day_ts.normalize() - sem_start).days // 7 + 1).astype(str)
+    n_days, n_slots, n_struc = len(days), len(slots), len(structures)
+    day_idx = np.repeat(np.arange(n_days), n_slots * n_struc)
+    slot_idx = np.tile(np.repeat(np.arange(n_slots), n_struc), n_days)
+    struc_idx = np.tile(np.arange(n_struc), n_days * n_slots)
+    frame = pd.DataFrame({
+        "date": np.array([str(day) for day in days])[day_idx],
+        "structure": structures[struc_idx],
+        "day_of_week": day_ts.day_name().to_numpy()[day_idx],
+        "month": day_ts.month.to_numpy()[day_idx],
+        "week_sem": week_sem[day_idx],
+        "half_hour": (slots.hour + (slots.minute >= 30) * 0.5).to_numpy()[slot_idx],
+        "time": slots.strftime("%H:%M:%S").to_numpy()[slot_idx],
+    })
+    keys = pd.MultiIndex.from_arrays([frame["structure"], frame["half_hour"]])
+    frame["avg_hh"] = avg_hh.reindex(keys).fillna(0).to_numpy(dtype=float)
+    return frame
+
+def predict_forecast(model, dataset, days):
+    """
+    {date: {"HH:MM:SS": {structure: avail}}} for `days`, predicted in one
+    batched call over the whole grid and pivoted once.
+    """
+    frame = forecast_frame(dataset, days)
+    frame["avail"] = model.predict(frame[FEATURE_COLS]).round().astype(int)
+    pivot = frame.pivot(index=["date", "time"], columns="structure", values="avail")
+    return {str(day): pivot.loc[str(day)].to_dict(orient="index") for day in days}
+
+def write_forecast_shards(forecast, directory=FORECAST_DIR):
+    """
+    Writes `forecast` as one {date}.npy per day, a (time, structure) array of
+    int16 (int32 if a value does not fit), and a manifest.json naming the
+    days, times and structures; day files it no longer names are removed
+    afterwards. Each file is replaced atomically, but not the set: while an
+    existing directory is rewritten, a reader can pair the old manifest
+    with new day files. Readers that must see one consistent forecast
+    should follow the versions publish_forecast writes instead.
+    """
+    days = sorted(forecast)
+    times = sorted(forecast[days[0]])
+    structures = sorted({s for slots in forecast.values() for row in slots.values() for s in row})
+    values = np.array([[[forecast[day][t][s] for s in structures] for t in times] for day in days])
+    small = np.iinfo(np.int16)
+    values = values.astype(np.int16 if small.min <= values.min() and values.max() <= small.max else np.int32)
+    os.makedirs(directory, exist_ok=True)
+    for day, array in zip(days, values):
+        buffer = BytesIO()
+        np.save(buffer, array)
+        replace_file(os.path.join(directory, f"{day}.npy"), buffer.getvalue())
+    digest = hashlib.sha256(json.dumps(structures).encode() + json.dumps(times).encode() + values.tobytes())
+    manifest = {
+        "format": 1,
+        "version": digest.hexdigest()[:16],
+        "dtype": values.dtype.str,
+        "days": days,
+        "times": times,
+        "structures": structures,
+    }
+    replace_file(os.path.join(directory, "manifest.json"), json.dumps(manifest, indent=1).encode())
+    for name in os.listdir(directory):
+        if name.endswith(".npy") and name[:-4] not in days:
+            os.remove(os.path.join(directory, name))
+    return manifest
+
+def publish_forecast(forecast, root=PUBLISH_DIR):
+    """
+    Writes `forecast` as root/v-{version}/ (forecast.json and the day shards)
+    and then points root/current.json at it. The version directory is filled
+    under a temporary name and renamed into place, and current.json is
+    replaced in one rename, so a reader following the pointer only ever sees
+    a complete version. The oldest versions beyond KEEP_VERSIONS are removed.
+    """
+    os.makedirs(root, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=root, prefix=".v-")
+    try:
+        manifest = write_forecast_shards(forecast, tmp)
+        replace_file(os.path.join(tmp, "forecast.json"), json.dumps(forecast, separators=(",", ":")).encode())
+        name = f"v-{manifest['version']}"
+        if os.path.isdir(os.path.join(root, name)):
+            # the same forecast was published before
+            shutil.rmtree(tmp)
+        else:
+            os.chmod(tmp, 0o755)
+            os.rename(tmp, os.path.join(root, name))
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    pointer = {"version": manifest["version"], "path": name, "published_at": datetime.now().astimezone().isoformat()}
+    replace_file(os.path.join(root, "current.json"), json.dumps(pointer).encode())
+
+    versions = sorted((entry for entry in os.scandir(root) if entry.is_dir() and entry.name.startswith("v-")),
+                      key=lambda entry: entry.stat().st_mtime)
+    for entry in versions[:-KEEP_VERSIONS]:
+        if entry.name != name:
+            shutil.rmtree(entry.path, ignore_errors=True)
+    return pointer
+
+def refresh_forecast(root=PUBLISH_DIR):
+    """Ingests new scrapes, retrains and publishes a new forecast version."""
+    try:
+        ingest()
+    except Exception:
+        # a forecast for the new week is still worth publishing from the rows already stored
+        log.exception("ingest failed; training on the stored rows")
+    dataset = load_dataset()
+    model, report = train_model(dataset)
+    pointer = publish_forecast(predict_forecast(model, dataset, forecast_days()), root)
+    return {"forecast": pointer, "training": report}
+
+def run_refresh(interval=REFRESH_INTERVAL, root=PUBLISH_DIR):
+    """Runs refresh_forecast every `interval` seconds (once if it is 0); meant to run as its own process."""
+    while True:
+        started = time.monotonic()
+        try:
+            result = refresh_forecast(root)
+            log.info("published forecast %s", result["forecast"]["version"])
+        except Exception:
+            log.exception("forecast refresh failed; the published version is unchanged")
+        if interval <= 0:
+            return
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
 
 if __name__ == "__main__":
-    print(createModel())
\ No newline at end of file
+    if sys.argv[1:] == ["ingest"]:
+        print(ingest())
+    elif sys.argv[1:] == ["features"]:
+        print(update_features())
+    elif sys.argv[1:2] == ["refresh"]:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+        run_refresh(float(sys.argv[2]) if len(sys.argv) > 2 else REFRESH_INTERVAL)
+    else:
+        print(createModel())
\ No newline at end of file
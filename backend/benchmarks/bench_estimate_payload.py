@@ -0,0 +1,76 @@
+"""
+Bytes and serialization time of /estimate bodies: the full TomTom payload
+versus the compact summary + encoded polyline, with and without gzip, and
+whether the polyline decodes back to the route's points.
+
+The route is synthetic but shaped like a calculateRoute answer for a ~10 km
+drive into campus (a point every ~30 m plus guidance instructions).
+
+    python -m backend.benchmarks.bench_estimate_payload
+"""
+import gzip
+import json
+import math
+import random
+import timeit
+
+from backend.polyline import decode, encode
+from backend.responses import dumps
+from backend.server import route_points
+
+
+def synthetic_route(n_points=340, n_instructions=24, seed=7):
+    rng = random.Random(seed)
+    lat, lon = 33.80, -117.95
+    heading = math.radians(40)
+    points = []
+    for _ in range(n_points):
+        heading += rng.uniform(-0.15, 0.15)
+        lat += 0.00027 * math.cos(heading)
+        lon += 0.00032 * math.sin(heading)
+        points.append({"latitude": round(lat, 5), "longitude": round(lon, 5)})
+    summary = {
+        "lengthInMeters": 10214, "travelTimeInSeconds": 1032, "trafficDelayInSeconds": 41,
+        "trafficLengthInMeters": 880, "departureTime": "2025-12-08T09:41:12-08:00",
+        "arrivalTime": "2025-12-08T09:58:24-08:00",
+    }
+    instructions = [{
+        "routeOffsetInMeters": i * 420, "travelTimeInSeconds": i * 43,
+        "point": points[i * n_points // n_instructions], "pointIndex": i * n_points // n_instructions,
+        "instructionType": "TURN", "street": "North State College Boulevard", "countryCode": "USA",
+        "junctionType": "REGULAR", "turnAngleInDecimalDegrees": 90, "maneuver": "TURN_RIGHT",
+        "message": "Turn right onto North State College Boulevard",
+    } for i in range(n_instructions)]
+    return {
+        "formatVersion": "0.0.12",
+        "routes": [{
+            "summary": summary,
+            "legs": [{"summary": summary, "points": points}],
+            "sections": [{"startPointIndex": 0, "endPointIndex": n_points - 1, "sectionType": "TRAVEL_MODE", "travelMode": "car"}],
+            "guidance": {"instructions": instructions, "instructionGroups": []},
+        }],
+    }
+
+
+def main():
+    data = synthetic_route()
+    base = {"total_time_parking": 7, "distance": 6.35, "travel_time_hr": 0, "travel_time_minutes": 17, "travel_time_sec": 12}
+    bodies = {
+        "full (json.dumps)": lambda: json.dumps({**base, "route": data}).encode(),
+        "full (fast)": lambda: dumps({**base, "route": data}),
+        "compact": lambda: dumps({**base, "summary": data["routes"][0]["summary"], "polyline": encode(route_points(data))}),
+        "compact, 5 m tolerance": lambda: dumps({**base, "summary": data["routes"][0]["summary"], "polyline": encode(route_points(data, 5))}),
+    }
+    print(f"{'body':<24}{'bytes':>9}{'gzip':>9}{'us/build':>11}")
+    for name, build in bodies.items():
+        raw = build()
+        per_call = timeit.timeit(build, number=200) / 200 * 1e6
+        print(f"{name:<24}{len(raw):>9}{len(gzip.compress(raw)):>9}{per_call:>11.1f}")
+
+    points = route_points(data)
+    same = all(abs(a - b) < 1e-9 for p, q in zip(decode(encode(points)), points) for a, b in zip(p, q))
+    print("\npolyline round-trips to the route points:", len(decode(encode(points))) == len(points) and same)
+
+
+if __name__ == "__main__":
+    main()
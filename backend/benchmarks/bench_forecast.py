@@ -0,0 +1,98 @@
+"""
+14-day forecast generation: the original per-day loop (dict rows, aggregates
+recomputed and model.predict called once per day) against
+auto.predict_forecast (one feature grid, one predict call, one pivot).
+
+The model is a CatBoostRegressor with createModel's settings, trained on a
+synthetic dataset; pass the iteration count to trade fidelity for setup time.
+
+    python -m backend.benchmarks.bench_forecast [iterations]
+"""
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostRegressor
+
+from backend.auto import FEATURE_COLS, forecast_days, predict_forecast
+
+STRUCTURES = ["Nutwood Structure", "State College Structure", "Eastside North", "Eastside South", "LotA&G"]
+
+
+def legacy_forecast(model, dataset, days):
+    structure = dataset['structure'].unique()
+    overall_forecast = {}
+    for day in days:
+        curr = pd.Timestamp(day).tz_localize('US/Pacific')
+        dow = curr.day_name()
+        times = pd.date_range("00:00", "23:55", freq="5min").time
+        avg_hh = dataset.groupby(['structure', 'half_hour'])['avg_hh'].mean()
+        sem_start = dataset.groupby('sem_count')['sem_start'].max().max()
+        week_sem = str(max(1, ((curr.normalize() - sem_start).days // 7 + 1)))
+        rows = []
+        for i in times:
+            hh = i.hour + (i.minute >= 30) * 0.5
+            for s in structure:
+                rows.append({
+                    "structure": s,
+                    "day_of_week": dow,
+                    "month": curr.month,
+                    "week_sem": week_sem,
+                    "half_hour": hh,
+                    "time": i.strftime("%H:%M:%S"),
+                    "avg_hh": float(avg_hh.get((s, hh), 0))
+                })
+        pred = pd.DataFrame(rows)
+        pred["avail"] = model.predict(pred[FEATURE_COLS]).round().astype(int)
+        pivot = pred.pivot(index="time", columns="structure", values="avail")
+        overall_forecast[str(day)] = pivot.to_dict(orient="index")
+    return overall_forecast
+
+
+def synthetic_dataset(n_days=200, seed=11):
+    """Feature columns shaped like createModel's, one row per structure every 5 minutes."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-01-21", tz="US/Pacific")
+    stamps = start + pd.to_timedelta(np.arange(n_days * 288) * 5, unit="min")
+    stamps = stamps.repeat(len(STRUCTURES))
+    frame = pd.DataFrame({"date": stamps, "structure": np.tile(STRUCTURES, n_days * 288)})
+    frame["sem_count"] = (frame["date"] >= pd.Timestamp("2025-08-01", tz="US/Pacific")).astype(int)
+    frame["sem_start"] = frame.groupby("sem_count")["date"].transform("min").dt.normalize()
+    frame["week_sem"] = ((frame["date"] - frame["sem_start"]).dt.days // 7 + 1).astype(str)
+    frame["day_of_week"] = frame["date"].dt.day_name()
+    frame["month"] = frame["date"].dt.month
+    frame["half_hour"] = frame["date"].dt.hour + (frame["date"].dt.minute >= 30) * 0.5
+    busy = np.exp(-((frame["half_hour"] - 11) ** 2) / 18)
+    frame["current_struc_avail"] = (1800 * (1 - 0.9 * busy) + rng.normal(0, 40, len(frame))).clip(0).round()
+    frame["avg_hh"] = frame.groupby(["structure", "half_hour"])["current_struc_avail"].transform("mean")
+    return frame
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    dataset = synthetic_dataset()
+    model = CatBoostRegressor(depth=10, learning_rate=0.02, iterations=iterations, loss_function="RMSE",
+                              l2_leaf_reg=5, random_seed=42, verbose=False, allow_writing_files=False)
+    model.fit(dataset[FEATURE_COLS], dataset["current_struc_avail"], cat_features=[0, 1, 2, 3])
+    days = forecast_days(date.today())
+
+    timings = {}
+    for name, run in (("per-day loop", legacy_forecast), ("single batch", predict_forecast)):
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            result = run(model, dataset, days)
+            best = min(best, time.perf_counter() - started)
+        timings[name] = (best, result)
+
+    (loop_s, loop_out), (batch_s, batch_out) = timings.values()
+    print(f"{len(dataset)} training rows, {iterations} iterations, {len(days)} days")
+    print(f"{'per-day loop':<14}{loop_s * 1e3:>10.1f} ms")
+    print(f"{'single batch':<14}{batch_s * 1e3:>10.1f} ms  ({loop_s / batch_s:.1f}x)")
+    print("identical output:", loop_out == batch_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+forecast.json against the per-day .npy shards in forecast/ that auto.py
+writes alongside it: bytes on disk and the time to get from the files to a
+ForecastIndex, or to a single day's values.
+
+    python -m backend.benchmarks.bench_forecast_format
+"""
+import json
+import os
+import timeit
+
+import numpy as np
+
+from backend.forecast_store import ForecastIndex, read_day, read_manifest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JSON_PATH = os.path.join(BACKEND, "forecast.json")
+SHARD_DIR = os.path.join(BACKEND, "forecast")
+
+
+def best_ms(fn, number=20):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e3
+
+
+def load_json():
+    with open(JSON_PATH, "rb") as f:
+        return json.loads(f.read())
+
+
+def main():
+    manifest = read_manifest(SHARD_DIR)
+    day = manifest["days"][len(manifest["days"]) // 2]
+    shard_bytes = sum(os.path.getsize(os.path.join(SHARD_DIR, name)) for name in os.listdir(SHARD_DIR))
+    day_bytes = os.path.getsize(os.path.join(SHARD_DIR, f"{day}.npy"))
+    compact = len(json.dumps(load_json(), separators=(",", ":")).encode())
+
+    print(f"{'format':<30}{'KiB':>9}")
+    print(f"{'forecast.json (indent=4)':<30}{os.path.getsize(JSON_PATH) / 1024:>9.1f}")
+    print(f"{'  without indentation':<30}{compact / 1024:>9.1f}")
+    print(f"{'forecast/ (all days)':<30}{shard_bytes / 1024:>9.1f}")
+    print(f"{'forecast/ (one day)':<30}{day_bytes / 1024:>9.1f}")
+    print()
+
+    timings = {
+        "json: parse": lambda: load_json(),
+        "json: parse + index": lambda: ForecastIndex.from_json(load_json()),
+        "json: one day": lambda: load_json()[day],
+        "shards: index": lambda: ForecastIndex.from_shards(SHARD_DIR),
+        "shards: one day": lambda: np.asarray(read_day(SHARD_DIR, day)),
+    }
+    print(f"{'load':<30}{'ms':>9}")
+    for name, fn in timings.items():
+        print(f"{name:<30}{best_ms(fn):>9.3f}")
+
+    same = ForecastIndex.from_shards(SHARD_DIR).to_json() == load_json()
+    print("\nshards round-trip to forecast.json:", same)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Incremental ingestion of the scraper CSV (auto.ingest) against a local
+HTTP server that serves a growing synthetic file, with or without Range
+support. Each step reports bytes transferred and wall time, and checks the
+Parquet store against filter_csv's parse-and-filter of the whole file:
+
+    full          first run, no checkpoint
+    append        new rows, resumed with a Range request
+    partial line  the file ends mid-line; that row waits for the next run
+    complete      the line is finished and more rows follow
+    no range      the server ignores Range; whole file re-read, no duplicates
+    rewrite       the file is replaced; only rows newer than the store's are added
+    unchanged     nothing new
+
+    python -m backend.benchmarks.bench_ingest
+"""
+import http.server
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import pandas as pd
+
+from backend.auto import ingest
+
+HEADER = b"structure,level,available,total,lastUpdated,timeScrape\n"
+LEVELS = {"Nutwood Structure": ["Level 1", "Level 2", "Level 3"], "Eastside North": ["Level 1", "Level 2"], "Lot A & G": ["Lot"]}
+
+
+def scrape_rows(start, n, seed):
+    """`n` scrapes five minutes apart from `start`, as the scraper writes them."""
+    rng = random.Random(seed)
+    lines = []
+    t = start
+    for i in range(n):
+        stamp = t.strftime("%m/%d/%Y %I:%M:%S %p").lstrip("0")
+        if i % 997 == 0:
+            # the scraper occasionally logs ISO timestamps
+            stamp = t.strftime("%Y-%m-%d %H:%M:%S")
+        for structure, levels in LEVELS.items():
+            for level in levels:
+                available = rng.choice(["Full", str(rng.randint(0, 900))])
+                lines.append(f"{structure},{level},{available},900, {stamp} ,{t:%H:%M:%S}\n")
+        t += timedelta(minutes=5)
+    return "".join(lines).encode()
+
+
+class ScrapeServer(http.server.ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ScrapeHandler)
+        self.data = b""
+        self.ranges = True
+        self.sent = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/parking_data.csv"
+
+
+class ScrapeHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        data = self.server.data
+        match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match and self.server.ranges:
+            start = int(match.group(1))
+            body = data[start:]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # ingest drops a full response once it has seen it cannot resume from it
+            return
+        self.server.sent += len(body)
+
+
+def reference(data):
+    """filter_csv's result for `data`, restricted to complete lines."""
+    parse = pd.read_csv(BytesIO(data[:data.rfind(b"\n") + 1]), dtype={"available": str})
+    parse["lastUpdated"] = parse["lastUpdated"].str.strip()
+    parse["datetime"] = pd.to_datetime(parse["lastUpdated"], format="mixed")
+    spring = (parse["datetime"] >= pd.Timestamp("2025-01-21 00:00:00")) & (parse["datetime"] <= pd.Timestamp("2025-05-22 23:59:59"))
+    fall = (parse["datetime"] >= pd.Timestamp("2025-08-01 00:00:00")) & (parse["datetime"] <= pd.Timestamp.now())
+    return parse[spring | fall]
+
+
+def stored(store):
+    if not os.path.isdir(store):
+        return reference(HEADER)
+    return pd.read_parquet(store).drop(columns=["semester", "day"])
+
+
+def same_rows(got, expected):
+    cols = ["datetime", "structure", "level", "available", "total"]
+    got = got[cols].astype({"available": str}).sort_values(cols).reset_index(drop=True)
+    expected = expected[cols].astype({"available": str}).sort_values(cols).reset_index(drop=True)
+    return len(got) == len(expected) and got.astype(str).equals(expected.astype(str))
+
+
+def main():
+    server = ScrapeServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    spring = scrape_rows(datetime(2025, 1, 21), 40 * 288, seed=1)
+    # the summer break is outside both semesters and is dropped
+    summer = scrape_rows(datetime(2025, 6, 10), 288, seed=2)
+    fall = scrape_rows(datetime(2025, 8, 1), 30 * 288, seed=3)
+    more = scrape_rows(datetime(2025, 8, 31), 288, seed=4)
+    tail = scrape_rows(datetime(2025, 9, 1), 12, seed=5)
+    later = scrape_rows(datetime(2025, 9, 1, 1), 288, seed=6)
+    rewritten = scrape_rows(datetime(2025, 8, 20), 20 * 288, seed=7)
+
+    cut = tail.rfind(b"\n", 0, len(tail) - 1) + 1 + 20
+    steps = [
+        ("full", HEADER + spring + summer + fall, True),
+        ("append", HEADER + spring + summer + fall + more, True),
+        ("partial line", HEADER + spring + summer + fall + more + tail[:cut], True),
+        ("complete", HEADER + spring + summer + fall + more + tail, True),
+        ("no range", HEADER + spring + summer + fall + more + tail + later, False),
+        ("rewrite", HEADER + rewritten, True),
+        ("unchanged", HEADER + rewritten, True),
+    ]
+
+    print(f"{'step':<14}{'file KiB':>10}{'sent KiB':>10}{'rows':>8}{'ms':>9}  matches filter_csv")
+    with tempfile.TemporaryDirectory() as tmp:
+        store, checkpoint = os.path.join(tmp, "parking"), os.path.join(tmp, "checkpoint.json")
+        expected = reference(HEADER)
+        for name, data, ranges in steps:
+            server.data, server.ranges, server.sent = data, ranges, 0
+            before = len(stored(store))
+            started = time.perf_counter()
+            ingest(server.url, store, checkpoint)
+            elapsed = time.perf_counter() - started
+            if name == "rewrite":
+                # history the store already has is kept; only newer rows come from the new file
+                newer = reference(data)
+                expected = pd.concat([expected, newer[newer["datetime"] > expected["datetime"].max()]])
+            elif name != "unchanged":
+                expected = reference(data)
+            got = stored(store)
+            print(f"{name:<14}{len(data) / 1024:>10.0f}{server.sent / 1024:>10.0f}{len(got) - before:>8}"
+                  f"{elapsed * 1e3:>9.1f}  {same_rows(got, expected)}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Cost of getting the campus nodes into a fresh worker: importing
+campus_nodes (parse RAW_NODE_DATA into lists) versus node_store.load_nodes
+(memory-map the compiled campus_nodes.bin). Each variant runs in its own
+interpreter; reported are wall time of the load, memory it allocated
+(tracemalloc) and the growth of the process's resident set.
+
+A second table scales the log up with synthetic nodes and compares
+parse_nodes_to_array with read_nodes on the compiled equivalent in-process.
+
+    python -m backend.benchmarks.bench_nodes
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+from backend.campus_nodes import parse_nodes_to_array
+from backend.node_store import compile_nodes, read_nodes, write_nodes
+
+VARIANTS = {
+    "parse campus_nodes": "from backend.campus_nodes import NODE_ARRAY as nodes",
+    "mmap campus_nodes.bin": "from backend.node_store import load_nodes; nodes = load_nodes()",
+}
+
+PROBE = """
+import json, time, tracemalloc
+import numpy, hashlib, struct, tempfile
+
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+before = rss_kb()
+tracemalloc.start()
+started = time.perf_counter()
+{load}
+elapsed = time.perf_counter() - started
+allocated = tracemalloc.get_traced_memory()[0]
+print(json.dumps({{"ms": elapsed * 1e3, "alloc_kb": allocated / 1024, "rss_kb": rss_kb() - before}}))
+"""
+
+
+def run(load, repeat=5):
+    # let the first run cache bytecode so both variants load from .pyc, as in a deployed worker
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    samples = []
+    for _ in range(repeat + 1):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(load=load)], capture_output=True, text=True, check=True, env=env)
+        samples.append(json.loads(out.stdout))
+    # the fastest run is the one least disturbed by the rest of the machine
+    return min(samples, key=lambda s: s["ms"])
+
+
+def synthetic_log(n, seed=3):
+    rng = random.Random(seed)
+    return "".join(f"N{i:06d}\n\n{rng.uniform(33.87, 33.89)}, {rng.uniform(-117.89, -117.88)}\n\n" for i in range(n))
+
+
+def allocated_kb(load):
+    tracemalloc.start()
+    result = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 1024
+
+
+def main():
+    print("fresh interpreter")
+    print(f"{'variant':<24}{'ms':>8}{'alloc KiB':>11}{'RSS KiB':>9}")
+    for name, load in VARIANTS.items():
+        result = run(load)
+        print(f"{name:<24}{result['ms']:>8.2f}{result['alloc_kb']:>11.1f}{result['rss_kb']:>9}")
+
+    print()
+    print(f"{'nodes':>8}{'parse ms':>10}{'mmap ms':>10}{'parse KiB':>11}{'mmap KiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (1_000, 10_000, 100_000):
+            raw = synthetic_log(n)
+            path = os.path.join(tmp, f"nodes-{n}.bin")
+            write_nodes(compile_nodes(parse_nodes_to_array(raw)), path)
+            parse = lambda: parse_nodes_to_array(raw)
+            mmap = lambda: read_nodes(path)
+            number = max(1, 20_000 // n)
+            parse_ms = min(timeit.repeat(parse, number=number, repeat=3)) / number * 1e3
+            mmap_ms = min(timeit.repeat(mmap, number=number, repeat=3)) / number * 1e3
+            print(f"{n:>8}{parse_ms:>10.2f}{mmap_ms:>10.2f}{allocated_kb(parse):>11.0f}{allocated_kb(mmap):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
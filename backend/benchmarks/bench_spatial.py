@@ -0,0 +1,49 @@
+"""
+Nearest-node lookup: the old linear haversine `min` over every node versus
+GridIndex, on the real campus nodes and on synthetic node sets scattered over
+campus and the surrounding blocks.
+
+    python -m backend.benchmarks.bench_spatial
+"""
+import random
+import time
+
+from backend.campus_nodes import NODE_ARRAY
+from backend.geo import haversine_distance
+from backend.spatial import GridIndex
+
+
+def linear_nearest(coords, lat, lon):
+    return min(coords, key=lambda n: haversine_distance(lat, lon, *coords[n]))
+
+
+def synthetic(n, rng):
+    return {f"N{i}": (33.870 + rng.random() * 0.025, -117.900 + rng.random() * 0.030) for i in range(n)}
+
+
+def per_query_us(fn, queries):
+    start = time.perf_counter()
+    for lat, lon in queries:
+        fn(lat, lon)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    rng = random.Random(42)
+    queries = [(33.872 + rng.random() * 0.02, -117.897 + rng.random() * 0.025) for _ in range(500)]
+    datasets = [("campus", {n: (lat, lon) for n, lat, lon in NODE_ARRAY})]
+    datasets += [(f"synthetic {n}", synthetic(n, rng)) for n in (2_000, 20_000, 50_000)]
+    print(f"{'nodes':<18}{'n':>7}{'build ms':>10}{'linear us':>12}{'grid us':>10}{'grid k=8 us':>13}")
+    for name, coords in datasets:
+        start = time.perf_counter()
+        index = GridIndex(list(coords), list(coords.values()))
+        build_ms = (time.perf_counter() - start) * 1e3
+        sample = queries if len(coords) < 10_000 else queries[:50]
+        linear = per_query_us(lambda lat, lon: linear_nearest(coords, lat, lon), sample)
+        grid = per_query_us(index.nearest, queries)
+        grid_k = per_query_us(lambda lat, lon: index.k_nearest(lat, lon, 8), queries)
+        print(f"{name:<18}{len(coords):>7}{build_ms:>10.1f}{linear:>12.1f}{grid:>10.1f}{grid_k:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
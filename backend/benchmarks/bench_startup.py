@@ -0,0 +1,69 @@
+"""
+Walking-graph construction at worker start: the original pure-Python
+O(n^2) build, the vectorized build, and loading the cached artifact; plus the
+wall time of importing backend.server with a cold and a warm cache.
+
+    python -m backend.benchmarks.bench_startup
+"""
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from backend.campus_nodes import NODE_ARRAY
+from backend.geo import haversine_distance
+from backend.walk_graph import build_arrays, load_or_build, to_graph
+
+
+def legacy_build_graph(node_coords, k_neighbors=4):
+    graph = {node: [] for node in node_coords}
+    items = list(node_coords.items())
+    for id1, (lat1, lon1) in items:
+        distances = []
+        for id2, (lat2, lon2) in items:
+            if id1 != id2:
+                distances.append((haversine_distance(lat1, lon1, lat2, lon2), id2))
+        distances.sort()
+        for d, neighbor in distances[:k_neighbors]:
+            graph[id1].append((neighbor, d))
+    return graph
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1e3
+
+
+def import_time(cache_dir):
+    code = "import time; t = time.perf_counter(); import backend.server; print(time.perf_counter() - t)"
+    env = dict(os.environ, WALK_GRAPH_CACHE_DIR=cache_dir)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip()) * 1e3
+
+
+def main():
+    rng = random.Random(3)
+    datasets = [("campus", NODE_ARRAY)]
+    for n in (2_000, 5_000):
+        datasets.append((f"synthetic {n}", [[f"N{i}", 33.87 + rng.random() * 0.025, -117.90 + rng.random() * 0.03] for i in range(n)]))
+    print(f"{'nodes':<16}{'n':>6}{'legacy ms':>11}{'vector ms':>11}{'cached ms':>11}")
+    for name, nodes in datasets:
+        coords = {row[0]: (row[1], row[2]) for row in nodes}
+        legacy = timed(lambda: legacy_build_graph(coords)) if len(nodes) <= 2_000 else float("nan")
+        vector = timed(lambda: to_graph(nodes, **build_arrays(nodes, 4)))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            load_or_build(nodes, 4, cache_dir)
+            cached = timed(lambda: load_or_build(nodes, 4, cache_dir))
+        print(f"{name:<16}{len(nodes):>6}{legacy:>11.1f}{vector:>11.1f}{cached:>11.1f}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = import_time(cache_dir)
+        warm = import_time(cache_dir)
+    print(f"import backend.server: cold cache {cold:.0f} ms, warm cache {warm:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
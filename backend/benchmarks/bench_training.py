@@ -0,0 +1,41 @@
+"""
+Cold training time: the original single fit of MODEL_PARAMS["iterations"]
+trees on every row against auto.train_model (hold-out, early stopping)
+with its default refit on every row and with the early-stopped model
+served as is.
+
+Runs on the synthetic feature rows of bench_forecast; the number of days
+sets the dataset size.
+
+    python -m backend.benchmarks.bench_training [days]
+"""
+import sys
+import tempfile
+import time
+
+from catboost import CatBoostRegressor
+
+from backend.auto import FEATURE_COLS, MODEL_PARAMS, train_model
+from backend.benchmarks.bench_forecast import synthetic_dataset
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    dataset = synthetic_dataset(n_days=days)
+    print(f"{len(dataset)} rows, {days} days, {MODEL_PARAMS['iterations']} iterations max")
+
+    started = time.perf_counter()
+    model = CatBoostRegressor(**MODEL_PARAMS)
+    model.fit(dataset[FEATURE_COLS], dataset["current_struc_avail"], cat_features=[0, 1, 2, 3])
+    print(f"{'single fit':<22}{time.perf_counter() - started:>9.1f} s  {model.tree_count_} trees")
+
+    for name, refit in (("train_model", True), ("train_model, no refit", False)):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, report = train_model(dataset, warm_start=False, refit=refit,
+                                    model_path=f"{tmp}/model.cbm", report_path=f"{tmp}/runs.jsonl")
+        print(f"{name:<22}{report['total_seconds']:>9.1f} s  {report['trees']} trees"
+              f"  (best iteration {report.get('best_iteration')}, hold-out MAE {report.get('holdout_mae', float('nan')):.1f})")
+
+
+if __name__ == "__main__":
+    main()
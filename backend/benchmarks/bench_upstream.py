@@ -0,0 +1,75 @@
+"""
+Throughput of the /estimate upstream call pattern against a local stub.
+
+Compares the old pattern (blocking `requests.get` inside a coroutine) with the
+shared pooled `httpx.AsyncClient`, both driven by N concurrent coroutines on one
+event loop, the way uvicorn drives concurrent requests on one worker.
+
+    python -m backend.benchmarks.bench_upstream [requests] [latency_ms]
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from backend.http_client import TOMTOM_TIMEOUT, close_client, get_client
+
+BODY = json.dumps({"routes": [{"summary": {"travelTimeInSeconds": 600, "lengthInMeters": 8000}}]}).encode()
+
+
+def start_stub(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer.request_queue_size = 256
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/routing"
+
+
+async def blocking_call(url):
+    return requests.get(url).json()
+
+
+async def pooled_call(url):
+    response = await get_client().get(url, timeout=TOMTOM_TIMEOUT)
+    return response.json()
+
+
+async def run(call, url, n):
+    start = time.perf_counter()
+    await asyncio.gather(*(call(url) for _ in range(n)))
+    return time.perf_counter() - start
+
+
+async def main(n, latency_ms):
+    server, url = start_stub(latency_ms / 1000)
+    try:
+        for name, call in (("requests.get (blocking)", blocking_call), ("httpx pooled (async)", pooled_call)):
+            elapsed = await run(call, url, n)
+            print(f"{name:<26} {n} calls  {elapsed:7.3f}s  {n / elapsed:8.1f} req/s")
+    finally:
+        await close_client()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(n, latency_ms))
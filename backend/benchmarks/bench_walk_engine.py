@@ -0,0 +1,80 @@
+"""
+Walk routing throughput: the original dict/string A* (haversine heuristic on
+every push) versus WalkEngine (CSR arrays, projected heuristic, reused
+buffers) on random node pairs of the campus graph and of a synthetic graph
+covering campus plus the surrounding blocks.
+
+    python -m backend.benchmarks.bench_walk_engine [pairs]
+"""
+import heapq
+import random
+import sys
+import time
+
+from backend.campus_nodes import NODE_ARRAY
+from backend.geo import haversine_distance
+from backend.walk_engine import WalkEngine
+from backend.walk_graph import build_arrays, to_graph
+
+
+def legacy_astar(graph, coords, start, goal):
+    def heuristic(n1, n2):
+        return haversine_distance(*coords[n1], *coords[n2])
+
+    open_set = [(heuristic(start, goal), start)]
+    came_from = {}
+    g = {start: 0}
+    closed = set()
+    while open_set:
+        _, current = heapq.heappop(open_set)
+        if current == goal:
+            path = [current]
+            while current in came_from:
+                current = came_from[current]
+                path.append(current)
+            return list(reversed(path))
+        if current in closed:
+            continue
+        closed.add(current)
+        for neighbor, cost in graph[current]:
+            tg = g[current] + cost
+            if tg < g.get(neighbor, float("inf")):
+                came_from[neighbor] = current
+                g[neighbor] = tg
+                heapq.heappush(open_set, (tg + heuristic(neighbor, goal), neighbor))
+    return None
+
+
+def path_cost(graph, path):
+    return sum(dict(graph[a])[b] for a, b in zip(path, path[1:]))
+
+
+def main(n_pairs):
+    rng = random.Random(11)
+    datasets = [("campus", NODE_ARRAY)]
+    datasets.append(("synthetic 3000", [[f"N{i}", 33.870 + rng.random() * 0.025, -117.900 + rng.random() * 0.030] for i in range(3000)]))
+    print(f"{'graph':<16}{'nodes':>6}{'legacy q/s':>12}{'engine q/s':>12}{'speedup':>9}")
+    for name, nodes in datasets:
+        coords = {row[0]: (row[1], row[2]) for row in nodes}
+        arrays = build_arrays(nodes, 4)
+        graph = to_graph(nodes, **arrays)
+        engine = WalkEngine(list(coords), list(coords.values()), **arrays)
+        ids = list(coords)
+        pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(n_pairs)]
+
+        start = time.perf_counter()
+        legacy = [legacy_astar(graph, coords, a, b) for a, b in pairs]
+        legacy_qps = n_pairs / (time.perf_counter() - start)
+        start = time.perf_counter()
+        fast = [engine.route(a, b) for a, b in pairs]
+        engine_qps = n_pairs / (time.perf_counter() - start)
+
+        for old, new in zip(legacy, fast):
+            assert (old is None) == (new is None)
+            if old is not None:
+                assert abs(path_cost(graph, old) - path_cost(graph, new)) < 1e-6
+        print(f"{name:<16}{len(nodes):>6}{legacy_qps:>12.0f}{engine_qps:>12.0f}{engine_qps / legacy_qps:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,77 @@
+"""
+Node expansions and latency per query for plain A* (projected heuristic)
+versus ALT (landmark bounds) on a synthetic walking graph the size of campus
+plus the surrounding blocks, with building footprints cut out as obstacles.
+Covers node-to-node queries (the precomputed walk table) and queries between
+random points snapped onto edges (/walk-route/point), and checks that ALT
+finds paths of the same cost.
+
+    python -m backend.benchmarks.bench_walk_landmarks [nodes] [pairs] [landmarks]
+"""
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from backend.landmarks import load_or_build_landmarks
+from backend.walk_engine import WalkEngine
+from backend.walk_graph import build_arrays, graph_key
+
+
+def synthetic_nodes(n, rng):
+    buildings = [(33.874 + rng.random() * 0.02, -117.897 + rng.random() * 0.025) for _ in range(40)]
+    nodes = []
+    while len(nodes) < n:
+        lat, lon = 33.870 + rng.random() * 0.025, -117.900 + rng.random() * 0.030
+        if any(abs(lat - b[0]) < 0.0012 and abs(lon - b[1]) < 0.0015 for b in buildings):
+            continue
+        nodes.append([f"N{len(nodes)}", lat, lon])
+    return nodes
+
+
+def run(search, pairs):
+    expansions, latency, costs = [], [], []
+    for a, b in pairs:
+        result = search(a, b)
+        costs.append(None if result is None else round(result.cost, 6))
+        if result is not None:
+            expansions.append(result.expansions)
+            latency.append(result.elapsed_ms)
+    return expansions, latency, costs
+
+
+def main(n, n_pairs, n_landmarks):
+    rng = random.Random(5)
+    nodes = synthetic_nodes(n, rng)
+    engine = WalkEngine([r[0] for r in nodes], [(r[1], r[2]) for r in nodes], **build_arrays(nodes, 6))
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(n_pairs)]
+    lat0, lon0 = min(r[1] for r in nodes), min(r[2] for r in nodes)
+    point = lambda: engine.snap(lat0 + rng.random() * 0.025, lon0 + rng.random() * 0.030)
+    points = [(point(), point()) for _ in range(n_pairs)]
+    queries = (("A*", engine.shortest_path, pairs), ("A* point", engine.shortest_path_between, points))
+
+    plain = [run(search, p) for _, search, p in queries]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        tables = load_or_build_landmarks(engine, graph_key(nodes, 6), n_landmarks, cache_dir)
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        load_or_build_landmarks(engine, graph_key(nodes, 6), n_landmarks, cache_dir)
+        load_ms = (time.perf_counter() - start) * 1e3
+    engine.set_landmarks(tables["landmarks"], tables["from_landmark"], tables["to_landmark"])
+    alt = [run(search, p) for _, search, p in queries]
+
+    print(f"{n} nodes, {n_pairs} pairs, {n_landmarks} landmarks (build {build_s:.2f}s, cached load {load_ms:.1f} ms)")
+    print(f"{'mode':<12}{'found':>7}{'mean exp':>10}{'p95 exp':>9}{'mean ms':>9}{'p95 ms':>8}  same cost")
+    p95 = lambda xs: statistics.quantiles(xs, n=20)[-1]
+    for (name, _, _), base, landmark in zip(queries, plain, alt):
+        for label, (exp, lat, costs) in ((name, base), (name.replace("A*", "ALT"), landmark)):
+            found = sum(c is not None for c in costs)
+            print(f"{label:<12}{found:>7}{statistics.mean(exp):>10.0f}{p95(exp):>9.0f}{statistics.mean(lat):>9.2f}"
+                  f"{p95(lat):>8.2f}  {costs == base[2]}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [5000, 300, 12][len(args):]))
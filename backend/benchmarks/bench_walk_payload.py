@@ -0,0 +1,57 @@
+"""
+Bytes and serialization time of /walk-route bodies over every
+Parking x Building pair: the Pydantic-validated route, the same body dumped
+straight from dicts, Douglas-Peucker simplified routes and encoded polylines.
+
+    python -m backend.benchmarks.bench_walk_payload
+"""
+import gzip
+import timeit
+
+from backend.polyline import encode, simplify
+from backend.responses import dumps
+from backend.server import WalkRouteResponse, walk_table
+
+
+def variants(body):
+    points = [(pt["latitude"], pt["longitude"]) for pt in body["route"]]
+    rest = {k: v for k, v in body.items() if k != "route"}
+
+    def route(tolerance_m):
+        pts = simplify(points, tolerance_m) if tolerance_m else points
+        return dumps({**rest, "route": [{"latitude": lat, "longitude": lon} for lat, lon in pts]})
+
+    def polyline(tolerance_m):
+        pts = simplify(points, tolerance_m) if tolerance_m else points
+        return dumps({**rest, "polyline": encode(pts)})
+
+    return {
+        "pydantic model": lambda: WalkRouteResponse(**body).model_dump_json(exclude_none=True).encode(),
+        "dict (fast)": lambda: dumps(body),
+        "route, 5 m": lambda: route(5),
+        "route, 15 m": lambda: route(15),
+        "polyline": lambda: polyline(None),
+        "polyline, 5 m": lambda: polyline(5),
+    }
+
+
+def main():
+    bodies = [entry[1] for entry in walk_table().values() if entry is not None]
+    totals = {}
+    for body in bodies:
+        for name, build in variants(body).items():
+            raw = build()
+            per_call = timeit.timeit(build, number=50) / 50 * 1e6
+            acc = totals.setdefault(name, [0, 0, 0.0])
+            acc[0] += len(raw)
+            acc[1] += len(gzip.compress(raw))
+            acc[2] += per_call
+    n = len(bodies)
+    print(f"{n} routes, mean per response")
+    print(f"{'body':<18}{'bytes':>9}{'gzip':>9}{'us/build':>11}")
+    for name, (raw, gz, us) in totals.items():
+        print(f"{name:<18}{raw / n:>9.0f}{gz / n:>9.0f}{us / n:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
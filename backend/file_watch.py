@@ -0,0 +1,55 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Optional, Sequence
+
+
+class FilePoller:
+    """
+    Polls `paths` every `interval` seconds and awaits `on_change` when the
+    (mtime, size, inode) of any of them differs from the last `mark`. A
+    missing file counts as a state of its own, so creating or deleting one
+    is a change too. The owner calls `mark` when it loads the files, which
+    keeps a change it already picked up from triggering again.
+    """
+
+    def __init__(self, paths: Sequence[str], on_change: Callable[[], Awaitable[None]], interval: float):
+        self.paths = list(paths)
+        self.on_change = on_change
+        self.interval = interval
+        self._stamp = self.stamp()
+        self._task: Optional[asyncio.Task] = None
+
+    def stamp(self):
+        stamp = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def mark(self):
+        self._stamp = self.stamp()
+
+    def changed(self) -> bool:
+        return self.stamp() != self._stamp
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.changed():
+                await self.on_change()
+
+    def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from .file_watch import FilePoller
+from .http_client import FORECAST_TIMEOUT, get_client
+
+log = logging.getLogger(__name__)
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# lot keys used by the API -> structure names written by auto.py
+STRUCTURE_ALIASES = {
+    "nutwood": "Nutwood Structure",
+    "stateCollege": "State College Structure",
+    "eastsideNorth": "Eastside North",
+    "eastsideSouth": "Eastside South",
+    "lotAG": "LotA&G",
+}
+
+
+def time_to_slot(hhmmss: str) -> int:
+    hour, minute = hhmmss.split(":")[:2]
+    return (int(hour) * 60 + int(minute)) // SLOT_MINUTES
+
+
+def normalize_structure(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def fill_missing(values: np.ndarray):
+    """
+    Fills the cells the forecast left out, in place. A missing day inside
+    the horizon borrows the same weekday of a neighbouring week; any slot
+    still missing is interpolated from the structure's nearest forecast
+    slots before and after it (held flat past either end), so a lookup
+    never returns NaN for a structure the forecast covers at all.
+    """
+    for d in range(values.shape[0]):
+        if np.isnan(values[d]).all():
+            for other in (d - 7, d + 7):
+                if 0 <= other < values.shape[0] and not np.isnan(values[other]).all():
+                    values[d] = values[other]
+                    break
+    series = values.reshape(-1, values.shape[2])
+    for col in range(series.shape[1]):
+        missing = np.isnan(series[:, col])
+        if missing.any() and not missing.all():
+            slots = np.arange(len(missing))
+            series[missing, col] = np.interp(slots[missing], slots[~missing], series[~missing, col])
+
+
+def read_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, "manifest.json")) as f:
+        return json.load(f)
+
+
+def read_day(directory: str, day: str) -> np.ndarray:
+    """One day's (time, structure) array, memory-mapped; only that day's file is read."""
+    return np.load(os.path.join(directory, f"{day}.npy"), mmap_mode="r")
+
+
+class ForecastIndex:
+    """
+    forecast.json held as a float32 array indexed [day, slot, structure].
+
+    Structure names are matched case- and punctuation-insensitively and the
+    API lot keys are accepted as aliases, so "lotAG", "LotAG" and "LotA&G" all
+    resolve to the same column. Lookups interpolate linearly between the two
+    surrounding 5-minute slots (rolling over midnight into the next day).
+    Dates outside the forecast horizon use the same weekday of the nearest
+    forecast week, which is what the model would predict for them anyway.
+    """
+
+    def __init__(self, start: date, values: np.ndarray, structures: List[str]):
+        self.start = start.toordinal()
+        self.values = values
+        self.n_days = values.shape[0]
+        self.structures = structures
+        self.structure_ids: Dict[str, int] = {normalize_structure(s): i for i, s in enumerate(structures)}
+        for alias, structure in STRUCTURE_ALIASES.items():
+            key = normalize_structure(structure)
+            if key in self.structure_ids:
+                self.structure_ids.setdefault(normalize_structure(alias), self.structure_ids[key])
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ForecastIndex":
+        dates = sorted(date.fromisoformat(d) for d in data)
+        structures = sorted({s for slots in data.values() for row in slots.values() for s in row})
+        col = {s: i for i, s in enumerate(structures)}
+        values = np.full(((dates[-1] - dates[0]).days + 1, SLOTS_PER_DAY, len(structures)), np.nan, dtype=np.float32)
+        for day, slots in data.items():
+            d = date.fromisoformat(day).toordinal() - dates[0].toordinal()
+            for hhmmss, row in slots.items():
+                s = time_to_slot(hhmmss)
+                for structure, avail in row.items():
+                    values[d, s, col[structure]] = avail
+        fill_missing(values)
+        return cls(dates[0], values, structures)
+
+    @classmethod
+    def from_shards(cls, directory: str) -> "ForecastIndex":
+        """Loads the per-day arrays written by auto.write_forecast_shards."""
+        manifest = read_manifest(directory)
+        dates = [date.fromisoformat(d) for d in manifest["days"]]
+        slots = [time_to_slot(t) for t in manifest["times"]]
+        values = np.full(((dates[-1] - dates[0]).days + 1, SLOTS_PER_DAY, len(manifest["structures"])), np.nan, dtype=np.float32)
+        shape = (len(slots), len(manifest["structures"]))
+        for day in dates:
+            array = read_day(directory, day.isoformat())
+            if array.shape != shape:
+                # a day file from another write than the manifest
+                raise ValueError(f"{day} shard is {array.shape}, manifest expects {shape}")
+            values[day.toordinal() - dates[0].toordinal(), slots] = array
+        fill_missing(values)
+        return cls(dates[0], values, manifest["structures"])
+
+    def to_json(self) -> dict:
+        """The forecast.json view, {date: {"HH:MM:SS": {structure: avail}}}."""
+        times = [f"{s * SLOT_MINUTES // 60:02d}:{s * SLOT_MINUTES % 60:02d}:00" for s in range(SLOTS_PER_DAY)]
+        return {
+            date.fromordinal(self.start + d).isoformat(): {
+                t: dict(zip(self.structures, map(int, row))) for t, row in zip(times, np.rint(day).astype(np.int64).tolist())
+            }
+            for d, day in enumerate(self.values)
+        }
+
+    def structure_id(self, name: str) -> int:
+        return self.structure_ids[normalize_structure(name)]
+
+    def _day(self, ordinal: int) -> int:
+        d = ordinal - self.start
+        if 0 <= d < self.n_days:
+            return d
+        if self.n_days < 7:
+            return min(max(d, 0), self.n_days - 1)
+        if d >= self.n_days:
+            return d - 7 * ((d - self.n_days) // 7 + 1)
+        return d + 7 * ((-d - 1) // 7 + 1)
+
+    def value(self, when: datetime, structure: str) -> float:
+        col = self.structure_id(structure)
+        minutes = when.hour * 60 + when.minute + when.second / 60
+        slot, frac = divmod(minutes / SLOT_MINUTES, 1)
+        slot = int(slot)
+        ordinal = when.toordinal()
+        a = self.values[self._day(ordinal), slot, col]
+        if slot + 1 < SLOTS_PER_DAY:
+            b = self.values[self._day(ordinal), slot + 1, col]
+        else:
+            b = self.values[self._day(ordinal + 1), 0, col]
+        return float(a + (b - a) * frac)
+
+
+class ForecastStore:
+    """
+    Per-worker copy of forecast.json.
+
+    The file is fetched once into a ForecastIndex and refreshed in the
+    background once it is older than `ttl` seconds. Refreshes send the last
+    ETag so an unchanged file costs a 304, and a failed refresh keeps serving
+    the previous index.
+
+    With `path` set to the current.json of a directory the refresh job
+    publishes to (auto.py refresh), the forecast is read from the version it
+    points at instead of `url`, and a FilePoller checks the pointer every
+    `interval` seconds. A new version is loaded in a worker thread and
+    swapped in by a single reference assignment.
+    """
+
+    def __init__(self, url: str, ttl: float = 900, path: Optional[str] = None, interval: float = 5):
+        self.url = url
+        self.ttl = ttl
+        self.path = path
+        self.interval = interval
+        self.version: Optional[str] = None
+        self.swaps = 0
+        self._index: Optional[ForecastIndex] = None
+        self._etag: Optional[str] = None
+        self._loaded_at = 0.0
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.poller = FilePoller([path], self._on_change, interval) if path else None
+
+    async def refresh(self) -> bool:
+        if self.path:
+            return await self.refresh_published()
+        headers = {"If-None-Match": self._etag} if self._etag else {}
+        try:
+            response = await get_client().get(self.url, headers=headers, timeout=FORECAST_TIMEOUT)
+            if response.status_code == 304:
+                self._loaded_at = time.monotonic()
+                return True
+            response.raise_for_status()
+            index = ForecastIndex.from_json(json.loads(response.content))
+        except (httpx.HTTPError, ValueError, IndexError):
+            return False
+        # single reference assignment, readers see either the old or new index
+        self._index = index
+        self._etag = response.headers.get("ETag")
+        self._loaded_at = time.monotonic()
+        return True
+
+    async def refresh_published(self) -> bool:
+        """Loads the version current.json points at, if it is not the one being served."""
+        self.poller.mark()
+        try:
+            with open(self.path) as f:
+                pointer = json.load(f)
+            if pointer["version"] != self.version:
+                directory = os.path.join(os.path.dirname(self.path), pointer["path"])
+                index = await asyncio.to_thread(ForecastIndex.from_shards, directory)
+                if self._index is not None:
+                    self.swaps += 1
+                self._index = index
+                self.version = pointer["version"]
+        except (OSError, ValueError, KeyError, IndexError):
+            return False
+        self._loaded_at = time.monotonic()
+        return True
+
+    async def _on_change(self):
+        previous = self.version
+        if not await self.refresh_published():
+            log.warning("could not load the forecast published at %s; keeping version %s", self.path, previous)
+        elif self.version != previous:
+            log.info("forecast swapped to version %s", self.version)
+
+    def start(self):
+        if self.poller is not None:
+            self.poller.start()
+
+    async def stop(self):
+        if self.poller is not None:
+            await self.poller.stop()
+
+    async def ensure_fresh(self):
+        if self._index is None:
+            if self._load_lock is None:
+                self._load_lock = asyncio.Lock()
+            async with self._load_lock:
+                if self._index is None and not await self.refresh():
+                    raise RuntimeError("forecast unavailable")
+            return
+        if time.monotonic() - self._loaded_at < self.ttl:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    def availability(self, when: datetime, structure: str) -> float:
+        return self._index.value(when, structure)
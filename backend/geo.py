@@ -0,0 +1,32 @@
+import math
+from typing import List, Sequence, Tuple
+
+EARTH_RADIUS_M = 6371000
+DEG = math.pi / 180
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    R = EARTH_RADIUS_M
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+
+
+def equirect_scale(ref_lat: float) -> Tuple[float, float]:
+    """Metres per degree of (longitude, latitude) around `ref_lat`."""
+    return EARTH_RADIUS_M * math.cos(ref_lat * DEG) * DEG, EARTH_RADIUS_M * DEG
+
+
+def project(points: Sequence[Tuple[float, float]], ref_lat: float = None) -> List[Tuple[float, float]]:
+    """
+    (lat, lon) pairs to local (x, y) metres on an equirectangular plane.
+    Over a few kilometres around campus the error against haversine is far
+    below a metre.
+    """
+    if ref_lat is None:
+        ref_lat = points[0][0]
+    kx, ky = equirect_scale(ref_lat)
+    return [(lon * kx, lat * ky) for lat, lon in points]
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .file_watch import FilePoller
+from .node_store import NODES_PATH, SOURCE_PATH, Nodes, load_nodes
+from .spatial import GridIndex
+from .walk_engine import WalkEngine
+
+log = logging.getLogger(__name__)
+
+
+class CampusGraph:
+    """
+    One version of the walking network: the nodes, their spatial index, the
+    routing engine and anything precomputed from them (`walk_table`). A
+    version is never modified once it is being served; a request holds on to
+    the instance it started with.
+    """
+
+    def __init__(self, version: str, nodes: Nodes, engine: WalkEngine):
+        self.version = version
+        self.nodes = nodes
+        self.coords: Dict[str, Tuple[float, float]] = dict(zip(engine.ids, engine.coords))
+        self.index = GridIndex(engine.ids, engine.coords)
+        self.engine = engine
+        self.walk_table: Dict = {}
+
+    def closest_node(self, lat: float, lon: float) -> str:
+        return self.index.nearest(lat, lon)
+
+
+class GraphStore:
+    """
+    The CampusGraph being served, swapped for a new version at runtime.
+
+    A FilePoller checks the compiled node artifact (and campus_nodes.py) every
+    `interval` seconds. When either changes, the nodes are reloaded and, if
+    they differ, `build` runs in a worker thread; the finished version then
+    replaces `current` in a single reference assignment. Requests already
+    running keep the version they read, new ones get the new one, and a
+    failed build leaves the old version in place.
+    """
+
+    def __init__(self, build: Callable[[Nodes], CampusGraph], path: str = NODES_PATH, source: str = SOURCE_PATH, interval: float = 30):
+        self.build = build
+        self.path = path
+        self.source = source
+        self.interval = interval
+        self.poller = FilePoller([path, source], self._on_change, interval)
+        self.current = build(load_nodes(path, source))
+        self.swaps = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def reload(self) -> bool:
+        """Rebuilds from the files on disk; True when a new version was swapped in."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self.poller.mark()
+            nodes = await asyncio.to_thread(load_nodes, self.path, self.source)
+            old = self.current.nodes
+            if nodes.ids == old.ids and np.array_equal(nodes.coords, old.coords):
+                return False
+            campus = await asyncio.to_thread(self.build, nodes)
+            self.current = campus
+            self.swaps += 1
+            return True
+
+    async def _on_change(self):
+        try:
+            if await self.reload():
+                log.info("walking graph swapped to version %s", self.current.version)
+        except Exception:
+            log.exception("walking graph reload failed; keeping version %s", self.current.version)
+
+    def start(self):
+        self.poller.start()
+
+    async def stop(self):
+        await self.poller.stop()
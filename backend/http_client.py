@@ -0,0 +1,35 @@
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+TOMTOM_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+FORECAST_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Shared keep-alive client for every upstream call made by this worker.
+    HTTP/2 is used when the optional `h2` package is installed.
+    Callers pass their own `timeout=`; the default here is only a backstop.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(http2=HTTP2, limits=LIMITS, timeout=httpx.Timeout(10.0))
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,95 @@
+import heapq
+import os
+from typing import Dict, List
+
+import numpy as np
+
+from .walk_engine import WalkEngine
+from .walk_graph import CACHE_DIR, cached_arrays
+
+# stands in for "unreachable" so differences stay finite; see WalkEngine.set_landmarks
+UNREACHABLE = 1e15
+
+
+def dijkstra_all(indptr: List[int], indices: List[int], weights: List[float], source: int) -> List[float]:
+    n = len(indptr) - 1
+    dist = [float("inf")] * n
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def reverse_csr(engine: WalkEngine):
+    n = len(engine)
+    sources = np.repeat(np.arange(n), np.diff(engine.indptr))
+    order = np.argsort(engine.indices, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(engine.indices, minlength=n), out=indptr[1:])
+    return indptr.tolist(), sources[order].tolist(), engine.weights[order].tolist()
+
+
+def is_symmetric(engine: WalkEngine) -> bool:
+    """Whether every edge u-v has a reverse v-u of the same weight."""
+    src = np.repeat(np.arange(len(engine)), np.diff(engine.indptr))
+    forward = np.lexsort((engine.weights, engine.indices, src))
+    backward = np.lexsort((engine.weights, src, engine.indices))
+    return (np.array_equal(src[forward], engine.indices[backward])
+            and np.array_equal(engine.indices[forward], src[backward])
+            and np.array_equal(engine.weights[forward], engine.weights[backward]))
+
+
+def build_landmarks(engine: WalkEngine, count: int) -> Dict[str, np.ndarray]:
+    """
+    Picks `count` landmarks by farthest-point selection (each new landmark is
+    the node farthest, by walking distance, from those already chosen) and
+    measures walking distance from and to every landmark. On a symmetric
+    graph the two are the same and each landmark costs one search.
+    """
+    n = len(engine)
+    count = min(count, n)
+    forward = engine.indptr.tolist(), engine.indices.tolist(), engine.weights.tolist()
+    backward = None if is_symmetric(engine) else reverse_csr(engine)
+    chosen: List[int] = []
+    to_lm, from_lm = [], []
+    nearest = np.full(n, np.inf)
+    # seed from the node farthest from node 0
+    seed = np.asarray(dijkstra_all(*forward, 0))
+    candidate = int(np.argmax(np.where(np.isfinite(seed), seed, -1.0))) if n else 0
+    while len(chosen) < count:
+        chosen.append(candidate)
+        d_from = np.asarray(dijkstra_all(*forward, candidate))
+        d_to = d_from if backward is None else np.asarray(dijkstra_all(*backward, candidate))
+        from_lm.append(d_from)
+        to_lm.append(d_to)
+        nearest = np.minimum(nearest, np.where(np.isfinite(d_from), d_from, np.inf))
+        score = np.where(np.isfinite(nearest), nearest, -1.0)
+        score[chosen] = -1.0
+        candidate = int(np.argmax(score))
+        if score[candidate] <= 0:
+            # everything reachable is already covered; pick an unreached node if any
+            unreached = np.flatnonzero(~np.isfinite(nearest))
+            unreached = unreached[~np.isin(unreached, chosen)]
+            if not len(unreached):
+                break
+            candidate = int(unreached[0])
+    return {
+        "landmarks": np.asarray(chosen, dtype=np.int32),
+        "from_landmark": np.minimum(np.vstack(from_lm), UNREACHABLE),
+        "to_landmark": np.minimum(np.vstack(to_lm), UNREACHABLE),
+    }
+
+
+def load_or_build_landmarks(engine: WalkEngine, key: str, count: int, cache_dir: str = CACHE_DIR) -> Dict[str, np.ndarray]:
+    """Landmark tables for the graph identified by `key` (see walk_graph.graph_key), cached on disk."""
+    path = os.path.join(cache_dir, f"walk_landmarks-{key}-{count}.npz")
+    return cached_arrays(path, lambda: build_landmarks(engine, count))
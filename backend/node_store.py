@@ -0,0 +1,126 @@
+import hashlib
+import importlib
+import json
+import os
+import struct
+import sys
+import tempfile
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+SOURCE_PATH = os.path.join(os.path.dirname(__file__), "campus_nodes.py")
+NODES_PATH = os.path.join(os.path.dirname(__file__), "campus_nodes.bin")
+MAGIC = b"TRNODES1"
+ALIGN = 8
+
+
+class Nodes(NamedTuple):
+    ids: List[str]
+    # (n, 2) float64 latitude/longitude, memory-mapped read-only when loaded from the artifact
+    coords: np.ndarray
+    # merged duplicate id -> id it was merged into
+    aliases: Dict[str, str]
+
+    def rows(self) -> List[List]:
+        """[[id, lat, lon], ...] in the shape of campus_nodes.NODE_ARRAY."""
+        return [[node, lat, lon] for node, (lat, lon) in zip(self.ids, self.coords.tolist())]
+
+
+def source_digest(path: str = SOURCE_PATH) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def compile_nodes(node_array: List[List]) -> Nodes:
+    """
+    Deduplicated nodes from parsed log rows. A node repeating an earlier
+    node's exact coordinates (B79 is B78 logged twice) is merged into it; an
+    id logged twice at different coordinates is an error in the log.
+    """
+    ids, coords, aliases = [], [], {}
+    by_coord: Dict[tuple, str] = {}
+    by_id: Dict[str, tuple] = {}
+    for node, lat, lon in node_array:
+        key = (float(lat), float(lon))
+        if node in by_id:
+            if by_id[node] != key:
+                raise ValueError(f"node {node} logged at two positions")
+            continue
+        by_id[node] = key
+        if key in by_coord:
+            aliases[node] = by_coord[key]
+            continue
+        by_coord[key] = node
+        ids.append(node)
+        coords.append(key)
+    return Nodes(ids, np.asarray(coords, dtype=np.float64).reshape(-1, 2), aliases)
+
+
+def write_nodes(nodes: Nodes, path: str = NODES_PATH, digest: str = ""):
+    """
+    Writes MAGIC, a length-prefixed JSON header, then the float64 coordinates
+    and fixed-width ASCII ids, each aligned to 8 bytes. Written atomically.
+    """
+    id_bytes = max((len(node) for node in nodes.ids), default=1)
+    header = json.dumps({
+        "count": len(nodes.ids), "id_bytes": id_bytes, "source_sha256": digest, "aliases": nodes.aliases,
+    }, separators=(",", ":")).encode()
+    prefix = len(MAGIC) + 4 + len(header)
+    header += b" " * (-prefix % ALIGN)
+    ids = np.asarray(nodes.ids, dtype=f"S{id_bytes}")
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".bin.tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        f.write(np.ascontiguousarray(nodes.coords, dtype="<f8").tobytes())
+        f.write(ids.tobytes())
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def read_nodes(path: str = NODES_PATH):
+    """(header, Nodes) with the coordinates memory-mapped from `path`."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a node artifact")
+        (size,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(size))
+    offset = len(MAGIC) + 4 + size
+    n, width = header["count"], header["id_bytes"]
+    coords = np.memmap(path, dtype="<f8", mode="r", offset=offset, shape=(n, 2)) if n else np.empty((0, 2))
+    raw_ids = np.fromfile(path, dtype=f"S{width}", count=n, offset=offset + 16 * n)
+    return header, Nodes([node.decode() for node in raw_ids.tolist()], coords, header["aliases"])
+
+
+def load_nodes(path: str = NODES_PATH, source: str = SOURCE_PATH) -> Nodes:
+    """
+    The campus nodes from the compiled artifact. If it is missing, unreadable
+    or was compiled from a different campus_nodes.py, the log is parsed and
+    the artifact rewritten (an unwritable directory only costs the parse).
+    """
+    digest = source_digest(source)
+    try:
+        header, nodes = read_nodes(path)
+        if header["source_sha256"] == digest:
+            return nodes
+    except (OSError, ValueError, KeyError):
+        pass
+    # re-execute campus_nodes if an older copy is already imported
+    name = f"{__package__}.campus_nodes"
+    module = importlib.reload(sys.modules[name]) if name in sys.modules else importlib.import_module(name)
+    nodes = compile_nodes(module.NODE_ARRAY)
+    try:
+        write_nodes(nodes, path, digest)
+    except OSError:
+        pass
+    return nodes
+
+
+if __name__ == "__main__":
+    from .campus_nodes import NODE_ARRAY
+
+    compiled = compile_nodes(NODE_ARRAY)
+    write_nodes(compiled, NODES_PATH, source_digest())
+    print(f"{len(compiled.ids)} nodes written to {NODES_PATH}")
+    for alias, node in compiled.aliases.items():
+        print(f"  merged {alias} into {node}")
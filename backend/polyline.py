@@ -0,0 +1,79 @@
+from typing import List, Sequence, Tuple
+
+from .geo import project
+
+LatLon = Tuple[float, float]
+
+
+def encode(points: Sequence[LatLon], precision: int = 5) -> str:
+    """Google encoded polyline of (lat, lon) pairs."""
+    factor = 10 ** precision
+    out = []
+    prev_lat = prev_lon = 0
+    for lat, lon in points:
+        ilat = int(round(lat * factor))
+        ilon = int(round(lon * factor))
+        for delta in (ilat - prev_lat, ilon - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                out.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            out.append(chr(value + 63))
+        prev_lat, prev_lon = ilat, ilon
+    return "".join(out)
+
+
+def decode(encoded: str, precision: int = 5) -> List[LatLon]:
+    """(lat, lon) pairs of a Google encoded polyline; the inverse of `encode`."""
+    factor = 10 ** precision
+    points = []
+    index = lat = lon = 0
+    while index < len(encoded):
+        for axis in range(2):
+            shift = result = 0
+            while True:
+                b = ord(encoded[index]) - 63
+                index += 1
+                result |= (b & 0x1F) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            delta = ~(result >> 1) if result & 1 else result >> 1
+            if axis == 0:
+                lat += delta
+            else:
+                lon += delta
+        points.append((lat / factor, lon / factor))
+    return points
+
+
+def simplify(points: Sequence[LatLon], tolerance_m: float) -> List[LatLon]:
+    """Douglas-Peucker simplification with the tolerance in metres."""
+    if tolerance_m <= 0 or len(points) < 3:
+        return list(points)
+    xy = project(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    tol2 = tolerance_m * tolerance_m
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = xy[first]
+        dx, dy = xy[last][0] - ax, xy[last][1] - ay
+        seg2 = dx * dx + dy * dy
+        worst, worst_d2 = -1, tol2
+        for i in range(first + 1, last):
+            px, py = xy[i][0] - ax, xy[i][1] - ay
+            if seg2 == 0:
+                d2 = px * px + py * py
+            else:
+                t = max(0.0, min(1.0, (px * dx + py * dy) / seg2))
+                ex, ey = px - t * dx, py - t * dy
+                d2 = ex * ex + ey * ey
+            if d2 > worst_d2:
+                worst, worst_d2 = i, d2
+        if worst != -1:
+            keep[worst] = True
+            stack.append((first, worst))
+            stack.append((worst, last))
+    return [p for p, k in zip(points, keep) if k]
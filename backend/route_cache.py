@@ -0,0 +1,78 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class RouteCache:
+    """
+    TTL + LRU cache for upstream routes with single-flight misses.
+
+    Origins are snapped to a grid of `cell_deg` degrees (0.002 is roughly
+    220 m x 185 m around campus) so students leaving the same block share an
+    entry. While a miss is being fetched, identical requests await the same
+    task instead of issuing their own upstream call. Failed fetches are not
+    cached.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 120, cell_deg: float = 0.002):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cell_deg = cell_deg
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def quantize(self, lat: float, long: float) -> Tuple[int, int]:
+        return round(lat / self.cell_deg), round(long / self.cell_deg)
+
+    def cell_center(self, cell: Tuple[int, int]) -> Tuple[float, float]:
+        return cell[0] * self.cell_deg, cell[1] * self.cell_deg
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[object]]):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        # the fetch runs as its own task, so cancelling any waiter (the first
+        # caller included) leaves it running for the others
+        task = asyncio.ensure_future(fetch())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._settle(key, done))
+        return await asyncio.shield(task)
+
+    def _settle(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            # failures are not cached; reading the exception also keeps a
+            # fetch nobody waited on from warning
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,308 @@
+import asyncio
+import heapq
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from .geo import haversine_distance
+from .http_client import TOMTOM_TIMEOUT, get_client
+from .route_cache import RouteCache
+
+Coord = Tuple[float, float]
+
+TOMTOM_BASE = "https://api.tomtom.com"
+ROAD_GRAPH_PATH = os.path.join(os.path.dirname(__file__), "road_graph.json")
+
+
+class UpstreamError(Exception):
+    """The routing service answered, but not with a route."""
+
+    def __init__(self, detail: str, upstream_status: Optional[int] = None):
+        super().__init__(detail)
+        self.upstream_status = upstream_status
+
+
+class UpstreamUnavailable(UpstreamError):
+    """The routing service could not be reached in time."""
+
+    def __init__(self, detail: str, status_code: int):
+        super().__init__(detail, None)
+        self.status_code = status_code
+
+
+class DriveTime(NamedTuple):
+    seconds: int
+    meters: float
+
+
+def summary_of(data: dict) -> DriveTime:
+    summary = data["routes"][0]["summary"]
+    return DriveTime(summary["travelTimeInSeconds"], summary["lengthInMeters"])
+
+
+class RoutingProvider:
+    """
+    Drive-time source for /estimate.
+
+    `route` returns a calculateRoute-shaped payload for one origin/destination.
+    `drive_times` answers one origin against many destinations; the default
+    fans out concurrent `route` calls and providers with a native batch API
+    override it and set `supports_matrix`.
+    """
+
+    name = "base"
+    supports_matrix = False
+
+    async def route(self, origin: Coord, dest: Coord) -> dict:
+        raise NotImplementedError
+
+    async def drive_times(self, origin: Coord, dests: Dict[str, Coord]) -> Dict[str, DriveTime]:
+        results = await asyncio.gather(*(self.route(origin, d) for d in dests.values()), return_exceptions=True)
+        times = {}
+        for name, result in zip(dests, results):
+            if isinstance(result, Exception):
+                if not isinstance(result, UpstreamError):
+                    raise result
+                continue
+            times[name] = summary_of(result)
+        if not times and results:
+            raise results[0]
+        return times
+
+
+async def _tomtom_request(method: str, url: str, **kwargs) -> httpx.Response:
+    try:
+        return await get_client().request(method, url, timeout=TOMTOM_TIMEOUT, **kwargs)
+    except httpx.TimeoutException:
+        raise UpstreamUnavailable("Routing service timed out.", 504)
+    except httpx.HTTPError:
+        raise UpstreamUnavailable("Routing service unreachable.", 502)
+
+
+class TomTomProvider(RoutingProvider):
+    name = "tomtom"
+
+    def __init__(self, api_key: str, base_url: str = TOMTOM_BASE):
+        self.api_key = api_key
+        self.base_url = base_url
+
+    async def route(self, origin: Coord, dest: Coord) -> dict:
+        url = f"{self.base_url}/routing/1/calculateRoute/{origin[0]},{origin[1]}:{dest[0]},{dest[1]}/json"
+        response = await _tomtom_request("GET", url, params={"traffic": "true", "travelMode": "car", "key": self.api_key})
+        if response.status_code != 200:
+            raise UpstreamError(response.text, response.status_code)
+        return response.json()
+
+
+class TomTomMatrixProvider(TomTomProvider):
+    """Answers `drive_times` with one synchronous Matrix Routing v2 call."""
+
+    name = "tomtom-matrix"
+    supports_matrix = True
+
+    async def drive_times(self, origin: Coord, dests: Dict[str, Coord]) -> Dict[str, DriveTime]:
+        names = list(dests)
+        body = {
+            "origins": [{"point": {"latitude": origin[0], "longitude": origin[1]}}],
+            "destinations": [{"point": {"latitude": dests[n][0], "longitude": dests[n][1]}} for n in names],
+            "options": {"departAt": "now", "routeType": "fastest", "traffic": "live", "travelMode": "car"},
+        }
+        response = await _tomtom_request("POST", f"{self.base_url}/routing/matrix/2", params={"key": self.api_key}, json=body)
+        if response.status_code != 200:
+            raise UpstreamError(response.text, response.status_code)
+        times = {}
+        for cell in response.json()["data"]:
+            summary = cell.get("routeSummary")
+            if summary is not None:
+                times[names[cell["destinationIndex"]]] = DriveTime(summary["travelTimeInSeconds"], summary["lengthInMeters"])
+        return times
+
+
+class LocalProvider(RoutingProvider):
+    """
+    Offline drive-time estimate over the small arterial/freeway graph in
+    road_graph.json.
+
+    The origin and destination are joined to their nearest few road nodes by
+    an access leg (straight-line distance times a circuity factor, driven at a
+    local speed, or a regional one for long legs), then Dijkstra runs over the
+    road graph. Answers in microseconds with no network, so it serves as the
+    fallback for TomTom and as the stand-in upstream for load tests.
+    """
+
+    name = "local"
+
+    def __init__(self, path: str = ROAD_GRAPH_PATH):
+        with open(path) as f:
+            profile = json.load(f)
+        self.access = profile["access"]
+        self.ids: List[str] = list(profile["nodes"])
+        self.coords: List[Tuple[float, float]] = [tuple(profile["nodes"][n]) for n in self.ids]
+        index = {n: i for i, n in enumerate(self.ids)}
+        self.adj: List[List[Tuple[int, float, float]]] = [[] for _ in self.ids]
+        for road in profile["roads"]:
+            mps = road["kph"] / 3.6
+            seq = [index[n] for n in road["nodes"]]
+            for a, b in zip(seq, seq[1:]):
+                meters = haversine_distance(*self.coords[a], *self.coords[b])
+                self.adj[a].append((b, meters, meters / mps))
+                self.adj[b].append((a, meters, meters / mps))
+
+    def _access_legs(self, point: Coord) -> List[Tuple[int, float, float]]:
+        legs = []
+        for i, (lat, lon) in enumerate(self.coords):
+            meters = haversine_distance(point[0], point[1], lat, lon) * self.access["circuity"]
+            legs.append((i, meters, meters / self._access_mps(meters)))
+        legs.sort(key=lambda leg: leg[2])
+        return legs[:self.access["candidates"]]
+
+    def _access_mps(self, meters: float) -> float:
+        if meters > self.access["regional_after_m"]:
+            return self.access["regional_kph"] / 3.6
+        return self.access["local_kph"] / 3.6
+
+    def estimate(self, origin: Coord, dest: Coord) -> Tuple[float, float, List[Coord]]:
+        # a straight access-speed leg only competes with the road graph for short trips
+        direct = haversine_distance(*origin, *dest) * self.access["circuity"]
+        best = (direct / self._access_mps(direct), direct, None) if direct <= self.access["regional_after_m"] else (float("inf"), 0.0, None)
+        egress = {i: (m, t) for i, m, t in self._access_legs(dest)}
+
+        n = len(self.ids)
+        time_to = [float("inf")] * n
+        meters_to = [0.0] * n
+        prev: List[Optional[int]] = [None] * n
+        heap = []
+        for i, m, t in self._access_legs(origin):
+            if t < time_to[i]:
+                time_to[i], meters_to[i] = t, m
+                heapq.heappush(heap, (t, i))
+        while heap:
+            t, i = heapq.heappop(heap)
+            if t > time_to[i]:
+                continue
+            if t >= best[0]:
+                break
+            if i in egress:
+                total = t + egress[i][1]
+                if total < best[0]:
+                    best = (total, meters_to[i] + egress[i][0], i)
+            for j, m, dt in self.adj[i]:
+                if t + dt < time_to[j]:
+                    time_to[j] = t + dt
+                    meters_to[j] = meters_to[i] + m
+                    prev[j] = i
+                    heapq.heappush(heap, (time_to[j], j))
+
+        seconds, meters, last = best
+        path = []
+        while last is not None:
+            path.append(self.coords[last])
+            last = prev[last]
+        return seconds, meters, [origin] + path[::-1] + [dest]
+
+    async def route(self, origin: Coord, dest: Coord) -> dict:
+        seconds, meters, points = self.estimate(origin, dest)
+        summary = {"lengthInMeters": int(round(meters)), "travelTimeInSeconds": int(round(seconds))}
+        return {
+            "provider": self.name,
+            "routes": [{
+                "summary": summary,
+                "legs": [{"summary": summary, "points": [{"latitude": lat, "longitude": lon} for lat, lon in points]}]
+            }]
+        }
+
+
+class FallbackProvider(RoutingProvider):
+    """
+    Asks `primary` first and answers from `fallback` when it is unreachable,
+    over quota (403/429), failing (5xx) or slower than `deadline` seconds. A
+    primary call cut off by the deadline keeps running so it can still fill
+    the route cache.
+    """
+
+    def __init__(self, primary: RoutingProvider, fallback: RoutingProvider, deadline: float):
+        self.primary = primary
+        self.fallback = fallback
+        self.deadline = deadline
+        self.name = f"{primary.name}+{fallback.name}"
+        self.fallbacks = 0
+
+    @staticmethod
+    def _should_fall_back(exc: Exception) -> bool:
+        if isinstance(exc, (UpstreamUnavailable, asyncio.TimeoutError)):
+            return True
+        status = getattr(exc, "upstream_status", None)
+        return status is not None and (status in (403, 429) or status >= 500)
+
+    async def _first(self, call, *args):
+        task = asyncio.ensure_future(call(*args))
+        # an abandoned call may still fail later; retrieve it so asyncio does not warn
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self.deadline)
+        except (UpstreamError, asyncio.TimeoutError) as e:
+            if not self._should_fall_back(e):
+                raise
+            self.fallbacks += 1
+            return None
+
+    async def route(self, origin: Coord, dest: Coord) -> dict:
+        data = await self._first(self.primary.route, origin, dest)
+        if data is None:
+            data = await self.fallback.route(origin, dest)
+        return data
+
+    async def drive_times(self, origin: Coord, dests: Dict[str, Coord]) -> Dict[str, DriveTime]:
+        times = await self._first(self.primary.drive_times, origin, dests) or {}
+        missing = {n: d for n, d in dests.items() if n not in times}
+        if missing:
+            times.update(await self.fallback.drive_times(origin, missing))
+        return times
+
+
+class CachedProvider(RoutingProvider):
+    """
+    Puts a RouteCache in front of another provider. Routes are requested from
+    the centre of the origin's cell so an entry does not depend on which
+    caller missed first.
+    """
+
+    def __init__(self, inner: RoutingProvider, cache: RouteCache):
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+        self.supports_matrix = inner.supports_matrix
+
+    async def route(self, origin: Coord, dest: Coord) -> dict:
+        cell = self.cache.quantize(*origin)
+        center = self.cache.cell_center(cell)
+        return await self.cache.get_or_fetch((cell, dest), lambda: self.inner.route(center, dest))
+
+    async def drive_times(self, origin: Coord, dests: Dict[str, Coord]) -> Dict[str, DriveTime]:
+        if not self.supports_matrix:
+            return await super().drive_times(origin, dests)
+        cell = self.cache.quantize(*origin)
+        center = self.cache.cell_center(cell)
+        key = (cell, "matrix", tuple(sorted(dests.items())))
+        return await self.cache.get_or_fetch(key, lambda: self.inner.drive_times(center, dests))
+
+
+PROVIDERS = {
+    TomTomProvider.name: TomTomProvider,
+    TomTomMatrixProvider.name: TomTomMatrixProvider,
+    LocalProvider.name: LocalProvider,
+}
+
+
+def make_provider(name: str, api_key: str, cache: RouteCache, fallback: Optional[str] = None, deadline: float = 2.5) -> RoutingProvider:
+    for n in (name, fallback):
+        if n is not None and n not in PROVIDERS:
+            raise ValueError(f"unknown routing provider {n!r}, expected one of {sorted(PROVIDERS)}")
+    if name == LocalProvider.name:
+        return LocalProvider()
+    provider = CachedProvider(PROVIDERS[name](api_key), cache)
+    if fallback is None:
+        return provider
+    return FallbackProvider(provider, PROVIDERS[fallback]() if fallback == LocalProvider.name else PROVIDERS[fallback](api_key), deadline)
@@ -1,35 +1,102 @@
-from fastapi import FastAPI, HTTPException
-import requests
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from contextlib import asynccontextmanager
+import asyncio
 import os
-import json
 import pytz
 import math
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
+from .forecast_store import ForecastStore
+from .http_client import close_client, get_client
+from .route_cache import RouteCache
+from .routing import UpstreamError, UpstreamUnavailable, make_provider
+from .polyline import encode, simplify
+from .responses import FastJSONResponse, dumps
 
 load_dotenv()
 API_KEY = os.getenv("API_KEY")
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app):
+    get_client()
+    GRAPHS.start()
+    forecast_store.start()
+    yield
+    await forecast_store.stop()
+    await GRAPHS.stop()
+    await close_client()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 URL = "https://raw.githubusercontent.com/NguyenJimmyT/TitanRush/refs/heads/main/backend/forecast.json"
+FORECAST_TTL = float(os.getenv("FORECAST_TTL", "900"))
+# current.json of a directory `auto.py refresh` publishes to; unset reads forecast.json from GitHub
+forecast_store = ForecastStore(
+    URL,
+    ttl=FORECAST_TTL,
+    path=os.getenv("FORECAST_PATH") or None,
+    interval=float(os.getenv("FORECAST_RELOAD_INTERVAL", "5"))
+)
+route_cache = RouteCache(
+    maxsize=int(os.getenv("ROUTE_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("ROUTE_CACHE_TTL", "120")),
+    cell_deg=float(os.getenv("ROUTE_CACHE_CELL_DEG", "0.002"))
+)
+router = make_provider(
+    os.getenv("ROUTING_PROVIDER", "tomtom"),
+    API_KEY,
+    route_cache,
+    fallback=os.getenv("ROUTING_FALLBACK", "local") or None,
+    deadline=float(os.getenv("ROUTING_FALLBACK_AFTER", "2.5"))
+)
 
 class Routing(BaseModel):
     lat: float
     long: float
     dest: str
+    compact: bool = False
+    tolerance_m: Optional[float] = None
+    fields: Optional[List[str]] = None
+
+class BestLotRequest(BaseModel):
+    lat: float
+    long: float
+    lots: Optional[List[str]] = None
 
 class WalkRouteRequest(BaseModel):
     parking_name: str
     building_name: str
+    tolerance_m: Optional[float] = None
+    polyline: bool = False
 
 class Coordinate(BaseModel):
     latitude: float
     longitude: float
 
+class WalkPointRequest(BaseModel):
+    origin: Coordinate
+    destination: Coordinate
+    tolerance_m: Optional[float] = None
+    polyline: bool = False
+
+class TripRequest(BaseModel):
+    lat: float
+    long: float
+    building_name: str
+    lots: Optional[List[str]] = None
+
+class WalkMatrixRequest(BaseModel):
+    parking_names: List[str]
+    building_names: Optional[List[str]] = None
+    include_routes: bool = False
+
 class WalkRouteResponse(BaseModel):
     building_name: str
-    route: List[Coordinate]
+    route: Optional[List[Coordinate]] = None
+    polyline: Optional[str] = None
     total_distance_m: float
     total_distance_miles: float
     walk_time_hours: int
@@ -59,70 +126,31 @@ Building = {
     "gordon": (33.879716073467556, -117.8842721419777)
 }
 
-from .campus_nodes import NODE_ARRAY
-
-NODE_COORDS: Dict[str, Tuple[float, float]] = {node_id: (lat, lon) for node_id, lat, lon in NODE_ARRAY}
-
-import heapq
-
-def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371000
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-
-def build_graph(k_neighbors=4):
-    graph = {node: [] for node in NODE_COORDS}
-    items = list(NODE_COORDS.items())
-    for id1, (lat1, lon1) in items:
-        distances = []
-        for id2, (lat2, lon2) in items:
-            if id1 != id2:
-                distances.append((haversine_distance(lat1, lon1, lat2, lon2), id2))
-        distances.sort()
-        for d, neighbor in distances[:k_neighbors]:
-            graph[id1].append((neighbor, d))
-    return graph
-
-GRAPH = build_graph()
-
-def heuristic(n1, n2):
-    lat1, lon1 = NODE_COORDS[n1]
-    lat2, lon2 = NODE_COORDS[n2]
-    return haversine_distance(lat1, lon1, lat2, lon2)
-
-def find_closest_node(lat, lon):
-    return min(NODE_COORDS.keys(), key=lambda n: haversine_distance(lat, lon, *NODE_COORDS[n]))
-
-def reconstruct_path(came_from, curr):
-    path = [curr]
-    while curr in came_from:
-        curr = came_from[curr]
-        path.append(curr)
-    return list(reversed(path))
-
-def astar(start, goal):
-    open_set = [(heuristic(start, goal), start)]
-    came_from = {}
-    g = {start: 0}
-    closed = set()
-    while open_set:
-        _, current = heapq.heappop(open_set)
-        if current == goal:
-            return reconstruct_path(came_from, current)
-        if current in closed:
-            continue
-        closed.add(current)
-        for neighbor, cost in GRAPH[current]:
-            tg = g[current] + cost
-            if tg < g.get(neighbor, float("inf")):
-                came_from[neighbor] = current
-                g[neighbor] = tg
-                heapq.heappush(open_set, (tg + heuristic(neighbor, goal), neighbor))
-    return None
+from .node_store import NODES_PATH, Nodes
+from .geo import haversine_distance
+from .graph_store import CampusGraph, GraphStore
+from .walk_graph import graph_key, load_or_build
+from .walk_engine import WalkEngine
+from .landmarks import load_or_build_landmarks
+
+K_NEIGHBORS = 4
+WALK_BRIDGE = os.getenv("WALK_BRIDGE_COMPONENTS", "0") == "1"
+WALK_LANDMARKS = int(os.getenv("WALK_LANDMARKS", "8"))
+# GPS positions farther than this from every walkway are rejected
+WALK_SNAP_MAX_M = float(os.getenv("WALK_SNAP_MAX_M", "400"))
+
+def build_campus(nodes: Nodes) -> CampusGraph:
+    node_array = nodes.rows()
+    arrays = load_or_build(node_array, K_NEIGHBORS, bridge=WALK_BRIDGE)
+    version = graph_key(node_array, K_NEIGHBORS, WALK_BRIDGE)
+    engine = WalkEngine(nodes.ids, nodes.coords, **arrays)
+    if WALK_LANDMARKS > 0:
+        engine.set_landmarks(**load_or_build_landmarks(engine, version, WALK_LANDMARKS))
+    # built here, in the reload worker thread, rather than on the first /walk-route/point
+    engine.build_edge_index()
+    campus = CampusGraph(version, nodes, engine)
+    campus.walk_table = build_walk_table(campus)
+    return campus
 
 def compute_distance_and_time(points):
     if len(points) < 2:
@@ -131,77 +159,208 @@ def compute_distance_and_time(points):
         points[i]["latitude"], points[i]["longitude"],
         points[i+1]["latitude"], points[i+1]["longitude"]
     ) for i in range(len(points) - 1))
+    return (total_m,) + walk_time(total_m)
+
+def walk_time(total_m):
     miles = total_m * 0.000621371
     hours_float = miles / 3
     total_sec = int(hours_float * 3600)
-    return total_m, miles, total_sec // 3600, (total_sec % 3600) // 60, total_sec % 60
+    return miles, total_sec // 3600, (total_sec % 3600) // 60, total_sec % 60
+
+MAX_AVAIL = {"nutwood": 2484, "stateCollege": 1373, "eastsideNorth": 1880, "eastsideSouth": 1341, "lotAG": 2104}
+TIME_PARKING = {"nutwood": 20, "stateCollege": 18, "eastsideNorth": 20, "eastsideSouth": 18, "lotAG": 14}
+
+def parking_search_minutes(dest, travel_sec):
+    arrival = datetime.now(pytz.timezone('US/Pacific')) + timedelta(seconds=travel_sec)
+    pred_avail = forecast_store.availability(arrival, dest)
+    percentage = (MAX_AVAIL[dest] - pred_avail) / MAX_AVAIL[dest]
+    return math.ceil(TIME_PARKING[dest] * percentage)
+
+async def ensure_forecast():
+    try:
+        await forecast_store.ensure_fresh()
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="Parking forecast unavailable.")
+
+def route_points(data, tolerance_m=None):
+    points = []
+    for leg in data["routes"][0].get("legs", []):
+        leg_points = [(p["latitude"], p["longitude"]) for p in leg.get("points", [])]
+        if points and leg_points and points[-1] == leg_points[0]:
+            leg_points = leg_points[1:]
+        points.extend(leg_points)
+    if tolerance_m:
+        points = simplify(points, tolerance_m)
+    return points
+
+@app.get("/stats")
+async def stats():
+    return {
+        "routing_provider": router.name,
+        "routing_fallbacks": getattr(router, "fallbacks", 0),
+        "route_cache": route_cache.stats(),
+        "graph_version": GRAPHS.current.version,
+        "graph_swaps": GRAPHS.swaps,
+        "forecast_version": forecast_store.version,
+        "forecast_swaps": forecast_store.swaps
+    }
 
 @app.post("/estimate")
 async def estimate_route(req: Routing):
-    location = {
-        "nutwood": (33.87923900540178, -117.88855798831945),
-        "stateCollege": (33.883140284399985, -117.88861163250014),
-        "eastsideNorth": (33.881009299648376, -117.88180150382846),
-        "eastsideSouth": (33.880301186357116, -117.88175590627496),
-        "lotAG": (33.88814961697887, -117.88741292165311)
-    }
-    api_req = f"https://api.tomtom.com/routing/1/calculateRoute/{req.lat},{req.long}:{location[req.dest][0]},{location[req.dest][1]}/json?traffic=true&travelMode=car&key={API_KEY}"
-    response = requests.get(api_req)
-    if response.status_code != 200:
-        return {"error": response.text}
-    data = response.json()
+    if req.dest not in Parking:
+        raise HTTPException(status_code=400, detail="Invalid parking name.")
+    try:
+        data = await router.route((req.lat, req.long), Parking[req.dest])
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except UpstreamError as e:
+        return {"error": str(e)}
     result = data["routes"][0]["summary"]
     total_sec = result["travelTimeInSeconds"]
     hrs = total_sec // 3600
     mins = (total_sec % 3600) // 60
     secs = total_sec % 60
-    response = requests.get(URL)
-    parkingEstimate = json.loads(response.text)
-    max_avail = {"nutwood": 2484, "stateCollege": 1373, "eastsideNorth": 1880, "eastsideSouth": 1341, "lotAG": 2104}
-    time_parking = {"nutwood": 20, "stateCollege": 18, "eastsideNorth": 20, "eastsideSouth": 18, "LotAG": 14}
-    search_struc = {"nutwood": "Nutwood Structure", "stateCollege": "State College Structure", "eastsideNorth": "Eastside North", "eastsideSouth": "Eastside South", "LotAG": "LotA&G"}
-    curr_pst = datetime.now(pytz.timezone('US/Pacific'))
-    curr_pst += timedelta(minutes=mins)
-    temp_time = curr_pst.hour * 60 + curr_pst.minute
-    roundfive = (temp_time // 5) * 5
-    curr_pst = curr_pst.replace(hour=roundfive//60, minute=roundfive%60, second=0, microsecond=0)
-    curr_time = curr_pst.strftime('%H:%M:%S')
-    curr_date = curr_pst.strftime('%Y-%m-%d')
-    pred_avail = parkingEstimate[curr_date][curr_time][search_struc[req.dest]]
-    spots_taken = max_avail[req.dest] - pred_avail
-    percentage = spots_taken / max_avail[req.dest]
-    estimate_time = math.ceil(time_parking[req.dest] * percentage)
-    return {
+    await ensure_forecast()
+    estimate_time = parking_search_minutes(req.dest, total_sec)
+    body = {
         "total_time_parking": estimate_time,
         "distance": result["lengthInMeters"] * 0.0006213712,
         "travel_time_hr": hrs,
         "travel_time_minutes": mins,
-        "travel_time_sec": secs,
-        "route": data
+        "travel_time_sec": secs
+    }
+    if req.compact:
+        body["summary"] = result
+        body["polyline"] = encode(route_points(data, req.tolerance_m))
+    else:
+        body["route"] = data
+    if req.fields:
+        body = {k: v for k, v in body.items() if k in req.fields}
+    return FastJSONResponse(body)
+
+@app.post("/estimate/best")
+async def best_lot(req: BestLotRequest):
+    names = req.lots or list(Parking)
+    unknown = [n for n in names if n not in Parking]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid parking name: {', '.join(unknown)}.")
+    try:
+        drive = await router.drive_times((req.lat, req.long), {n: Parking[n] for n in names})
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except UpstreamError as e:
+        return {"error": str(e)}
+    await ensure_forecast()
+    lots = []
+    for name, (travel_sec, meters) in drive.items():
+        parking_min = parking_search_minutes(name, travel_sec)
+        lots.append({
+            "dest": name,
+            "travel_time_sec": travel_sec,
+            "distance": meters * 0.0006213712,
+            "total_time_parking": parking_min,
+            "total_time_sec": travel_sec + parking_min * 60
+        })
+    lots.sort(key=lambda lot: lot["total_time_sec"])
+    return {"best": lots[0]["dest"] if lots else None, "lots": lots}
+
+def walk_route_body(parking_name, building_name, campus):
+    engine = campus.engine
+    start_lat, start_lon = Parking[parking_name]
+    dest_lat, dest_lon = Building[building_name]
+    start = engine.index[campus.closest_node(start_lat, start_lon)]
+    dest = engine.index[campus.closest_node(dest_lat, dest_lon)]
+    if not engine.reachable(start, dest):
+        # the lot and building snap to disconnected parts of the network
+        return None
+    result = engine.shortest_path(start, dest)
+    pts = [{"latitude": start_lat, "longitude": start_lon}]
+    for i in result.nodes:
+        lat, lon = engine.coords[i]
+        pts.append({"latitude": lat, "longitude": lon})
+    pts.append({"latitude": dest_lat, "longitude": dest_lon})
+    total_m, total_miles, h, m, s = compute_distance_and_time(pts)
+    return {
+        "building_name": building_name,
+        "route": pts,
+        "total_distance_m": total_m,
+        "total_distance_miles": total_miles,
+        "walk_time_hours": h,
+        "walk_time_minutes": m,
+        "walk_time_seconds": s
     }
 
+def route_stats_headers(result):
+    # expansions and search time of the query this response came from
+    return {"X-Route-Expansions": str(result.expansions), "Server-Timing": f"route;dur={result.elapsed_ms:.3f}"}
+
+def build_walk_table(campus) -> Dict[Tuple[str, str], Tuple[bytes, dict]]:
+    # every Parking x Building route, serialized once per graph version,
+    # with the body itself for the simplified/encoded variants; /walk-route
+    # runs no search, so it sends no per-query route stats
+    table = {}
+    for p in Parking:
+        for b in Building:
+            body = walk_route_body(p, b, campus)
+            # unreachable pairs are kept as None and answered with a 422
+            table[(p, b)] = (dumps(body), body) if body is not None else None
+    return table
+
+# the walking network is rebuilt in the background and swapped in whenever
+# the compiled node artifact changes; see graph_store.GraphStore
+GRAPHS = GraphStore(
+    build_campus,
+    path=os.getenv("GRAPH_NODES_PATH", NODES_PATH),
+    interval=float(os.getenv("GRAPH_RELOAD_INTERVAL", "30"))
+)
+
+def walk_table():
+    return GRAPHS.current.walk_table
+
 @app.post("/walk-route", response_model=WalkRouteResponse)
 async def walk_route(req: WalkRouteRequest):
     if req.parking_name not in Parking:
         raise HTTPException(status_code=400, detail="Invalid parking name.")
     if req.building_name not in Building:
         raise HTTPException(status_code=400, detail="Invalid building name.")
-    start_lat, start_lon = Parking[req.parking_name]
-    dest_lat, dest_lon = Building[req.building_name]
-    start_node = find_closest_node(start_lat, start_lon)
-    dest_node = find_closest_node(dest_lat, dest_lon)
-    node_path = astar(start_node, dest_node)
-    if not node_path:
-        pts = [{"latitude": start_lat, "longitude": start_lon}, {"latitude": dest_lat, "longitude": dest_lon}]
+    entry = walk_table()[(req.parking_name, req.building_name)]
+    if entry is None:
+        raise HTTPException(status_code=422, detail="No walking path between this parking lot and building.")
+    content, body = entry
+    if req.tolerance_m is None and not req.polyline:
+        return Response(content=content, media_type="application/json")
+    return FastJSONResponse(shape_route(body, req.tolerance_m, req.polyline))
+
+def shape_route(body, tolerance_m=None, polyline=False):
+    # distance and time stay those of the full path; only the geometry is reduced
+    points = [(pt["latitude"], pt["longitude"]) for pt in body["route"]]
+    if tolerance_m:
+        points = simplify(points, tolerance_m)
+    body = {k: v for k, v in body.items() if k != "route"}
+    if polyline:
+        body["polyline"] = encode(points)
     else:
-        pts = [{"latitude": start_lat, "longitude": start_lon}]
-        for node in node_path:
-            lat, lon = NODE_COORDS[node]
-            pts.append({"latitude": lat, "longitude": lon})
-        pts.append({"latitude": dest_lat, "longitude": dest_lon})
+        body["route"] = [{"latitude": lat, "longitude": lon} for lat, lon in points]
+    return body
+
+@app.post("/walk-route/point")
+async def walk_route_point(req: WalkPointRequest):
+    origin, destination = req.origin, req.destination
+    engine = GRAPHS.current.engine
+    source = engine.snap(origin.latitude, origin.longitude)
+    target = engine.snap(destination.latitude, destination.longitude)
+    if max(source.distance_m, target.distance_m) > WALK_SNAP_MAX_M:
+        raise HTTPException(status_code=422, detail="Point is too far from the walking network.")
+    result = engine.shortest_path_between(source, target)
+    if result is None:
+        raise HTTPException(status_code=422, detail="No walking path between these points.")
+    pts = [origin.model_dump(), {"latitude": source.lat, "longitude": source.lon}]
+    for i in result.nodes:
+        lat, lon = engine.coords[i]
+        pts.append({"latitude": lat, "longitude": lon})
+    pts += [{"latitude": target.lat, "longitude": target.lon}, destination.model_dump()]
     total_m, total_miles, h, m, s = compute_distance_and_time(pts)
-    return {
-        "building_name": req.building_name,
+    body = {
         "route": pts,
         "total_distance_m": total_m,
         "total_distance_miles": total_miles,
@@ -209,3 +368,111 @@ async def walk_route(req: WalkRouteRequest):
         "walk_time_minutes": m,
         "walk_time_seconds": s
     }
+    if req.tolerance_m is not None or req.polyline:
+        body = shape_route(body, req.tolerance_m, req.polyline)
+    return FastJSONResponse(body, headers=route_stats_headers(result))
+
+def walk_legs(origin, dests, paths=False, campus=None):
+    """
+    Walking distance from `origin` to every (lat, lon) in `dests` with one
+    graph search, including the legs to and from the snapped nodes.
+    Returns {name: (total_m, [node coords])}, with None for destinations
+    that snap to a part of the network `origin` cannot reach.
+    """
+    campus = campus or GRAPHS.current
+    engine = campus.engine
+    start = engine.index[campus.closest_node(*origin)]
+    start_leg = haversine_distance(*origin, *engine.coords[start])
+    # destinations sharing a snapped node share one search target
+    dest_nodes = {name: engine.index[campus.closest_node(*coord)] for name, coord in dests.items()}
+    found = engine.one_to_many(start, set(dest_nodes.values()), paths=paths)
+    legs = {}
+    for name, node in dest_nodes.items():
+        if node in found:
+            cost, path = found[node]
+            total_m = start_leg + cost + haversine_distance(*engine.coords[node], *dests[name])
+            legs[name] = (total_m, [engine.coords[i] for i in path] if path else [])
+        else:
+            legs[name] = None
+    return legs
+
+@app.post("/walk-matrix")
+async def walk_matrix(req: WalkMatrixRequest):
+    buildings = req.building_names or list(Building)
+    bad_parking = [p for p in req.parking_names if p not in Parking]
+    if bad_parking or not req.parking_names:
+        raise HTTPException(status_code=400, detail="Invalid parking name.")
+    if any(b not in Building for b in buildings):
+        raise HTTPException(status_code=400, detail="Invalid building name.")
+    campus = GRAPHS.current
+    results = []
+    for parking_name in dict.fromkeys(req.parking_names):
+        start_lat, start_lon = Parking[parking_name]
+        legs = walk_legs((start_lat, start_lon), {b: Building[b] for b in buildings}, paths=req.include_routes, campus=campus)
+        unreachable = [b for b in buildings if legs[b] is None]
+        if unreachable:
+            raise HTTPException(status_code=422, detail=f"No walking path from {parking_name} to: {', '.join(unreachable)}.")
+        rows = []
+        for building_name in buildings:
+            total_m, nodes = legs[building_name]
+            miles, h, m, s = walk_time(total_m)
+            row = {
+                "building_name": building_name,
+                "total_distance_m": total_m,
+                "total_distance_miles": miles,
+                "walk_time_hours": h,
+                "walk_time_minutes": m,
+                "walk_time_seconds": s
+            }
+            if req.include_routes:
+                dest_lat, dest_lon = Building[building_name]
+                row["route"] = [{"latitude": lat, "longitude": lon} for lat, lon in [(start_lat, start_lon)] + nodes + [(dest_lat, dest_lon)]]
+            rows.append(row)
+        results.append({"parking_name": parking_name, "buildings": rows})
+    return FastJSONResponse({"results": results})
+
+@app.post("/plan-trip")
+async def plan_trip(req: TripRequest):
+    if req.building_name not in Building:
+        raise HTTPException(status_code=400, detail="Invalid building name.")
+    names = req.lots or list(Parking)
+    unknown = [n for n in names if n not in Parking]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid parking name: {', '.join(unknown)}.")
+    drive_task = asyncio.create_task(router.drive_times((req.lat, req.long), {n: Parking[n] for n in names}))
+    # the walk search runs on the loop before the drive-time task gets to send
+    # anything; it is one sub-millisecond search, and the graph is symmetric, so
+    # searching from the building covers every lot
+    walks = walk_legs(Building[req.building_name], {n: Parking[n] for n in names})
+    try:
+        await ensure_forecast()
+        drive = await drive_task
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except UpstreamError as e:
+        return {"error": str(e)}
+    finally:
+        if not drive_task.done():
+            drive_task.cancel()
+    lots = []
+    for name, (travel_sec, meters) in drive.items():
+        if walks[name] is None:
+            # no walking path from this lot to the building; it cannot be recommended
+            continue
+        parking_min = parking_search_minutes(name, travel_sec)
+        walk_m = walks[name][0]
+        miles, h, m, s = walk_time(walk_m)
+        walk_sec = h * 3600 + m * 60 + s
+        lots.append({
+            "dest": name,
+            "travel_time_sec": travel_sec,
+            "distance": meters * 0.0006213712,
+            "total_time_parking": parking_min,
+            "walk_distance_m": walk_m,
+            "walk_time_sec": walk_sec,
+            "total_time_sec": travel_sec + parking_min * 60 + walk_sec
+        })
+    if not lots and drive:
+        raise HTTPException(status_code=422, detail="No walking path from any parking lot to this building.")
+    lots.sort(key=lambda lot: lot["total_time_sec"])
+    return {"building_name": req.building_name, "best": lots[0]["dest"] if lots else None, "lots": lots}
@@ -0,0 +1,198 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geo import equirect_scale
+
+
+def _ring(cx: int, cy: int, r: int, nx: int, ny: int):
+    """Cells of an nx x ny grid on the square ring at Chebyshev distance `r` from (cx, cy)."""
+    if r == 0:
+        yield cx, cy
+        return
+    x0, x1 = max(cx - r, 0), min(cx + r, nx - 1)
+    for y in (cy - r, cy + r):
+        if 0 <= y < ny:
+            for x in range(x0, x1 + 1):
+                yield x, y
+    y0, y1 = max(cy - r + 1, 0), min(cy + r - 1, ny - 1)
+    for x in (cx - r, cx + r):
+        if 0 <= x < nx:
+            for y in range(y0, y1 + 1):
+                yield x, y
+
+
+def _cell_size(width: float, height: float, n: int) -> float:
+    """
+    Cell edge for about two points per cell over a width x height box, but
+    never fewer than sqrt(n) cells along its longer side, so points spread
+    along a line do not shrink the cells to nothing.
+    """
+    n = max(n, 1)
+    return max(math.sqrt(width * height * 2 / n), max(width, height) / math.sqrt(n), 1.0)
+
+
+class GridIndex:
+    """
+    Uniform grid over locally projected (equirectangular) coordinates for
+    nearest and k-nearest point queries.
+
+    Points are bucketed into square cells sized for about two points per cell
+    (see _cell_size). A query scans rings of cells outward from its own cell,
+    clipped to the grid, and stops once the k-th best distance is no larger
+    than the closest anything in an unscanned ring could be, so the cost
+    depends on local density rather than on the total number of points.
+    Distances are in metres.
+    """
+
+    def __init__(self, ids: Sequence[str], coords: Sequence[Tuple[float, float]], cell_m: float = None):
+        self.ids = list(ids)
+        latlon = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.ref_lat = float(latlon[:, 0].mean()) if len(latlon) else 0.0
+        self.kx, self.ky = equirect_scale(self.ref_lat)
+        xy = np.column_stack((latlon[:, 1] * self.kx, latlon[:, 0] * self.ky))
+        self.x: List[float] = xy[:, 0].tolist()
+        self.y: List[float] = xy[:, 1].tolist()
+        if len(xy):
+            self.x0, self.y0 = xy.min(axis=0).tolist()
+            width, height = (xy.max(axis=0) - xy.min(axis=0)).tolist()
+        else:
+            self.x0 = self.y0 = width = height = 0.0
+        if cell_m is None:
+            cell_m = _cell_size(width, height, len(xy))
+        self.cell_m = max(cell_m, 1.0)
+        cx = ((xy[:, 0] - self.x0) // self.cell_m).astype(np.int64)
+        cy = ((xy[:, 1] - self.y0) // self.cell_m).astype(np.int64)
+        self.nx = int(cx.max()) + 1 if len(xy) else 1
+        self.ny = int(cy.max()) + 1 if len(xy) else 1
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, key in enumerate(zip(cx.tolist(), cy.tolist())):
+            self.cells.setdefault(key, []).append(i)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def project(self, lat: float, lon: float) -> Tuple[float, float]:
+        return lon * self.kx, lat * self.ky
+
+    def k_nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[float, str]]:
+        """The `k` closest points as (distance_m, id), closest first."""
+        k = min(k, len(self.ids))
+        if k <= 0:
+            return []
+        qx, qy = self.project(lat, lon)
+        cell = self.cell_m
+        # start from the nearest in-grid cell when the query lies outside the grid
+        cx = min(max(int((qx - self.x0) // cell), 0), self.nx - 1)
+        cy = min(max(int((qy - self.y0) // cell), 0), self.ny - 1)
+        # anything outside ring r is at least (r + 0.5) cells from the start cell's centre
+        slack = math.hypot(qx - (self.x0 + (cx + 0.5) * cell), qy - (self.y0 + (cy + 0.5) * cell)) - 0.5 * cell
+        max_r = max(cx, self.nx - 1 - cx, cy, self.ny - 1 - cy)
+        best: List[Tuple[float, int]] = []  # max-heap of (-d2, i)
+        xs, ys, cells = self.x, self.y, self.cells
+        for r in range(max_r + 1):
+            for key in _ring(cx, cy, r, self.nx, self.ny):
+                for i in cells.get(key, ()):
+                    dx, dy = xs[i] - qx, ys[i] - qy
+                    d2 = dx * dx + dy * dy
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, i))
+                    elif d2 < -best[0][0]:
+                        heapq.heapreplace(best, (-d2, i))
+            if len(best) == k:
+                bound = r * cell - slack
+                if bound > 0 and bound * bound >= -best[0][0]:
+                    break
+        return [(math.sqrt(-d2), self.ids[i]) for d2, i in sorted(best, reverse=True)]
+
+    def nearest(self, lat: float, lon: float) -> str:
+        return self.k_nearest(lat, lon, 1)[0][1]
+
+
+class SegmentIndex:
+    """
+    Uniform grid of line segments for nearest-segment (edge snapping) queries.
+
+    Each segment is listed in every cell its bounding box overlaps, so the
+    ring search and stopping rule of GridIndex carry over: once the best
+    distance found is no larger than the distance to the first unscanned
+    ring, no unseen segment can be closer. Distances are in metres on the
+    same equirectangular projection.
+    """
+
+    def __init__(self, coords: Sequence[Tuple[float, float]], src: Sequence[int], dst: Sequence[int], cell_m: float = None):
+        latlon = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.ref_lat = float(latlon[:, 0].mean()) if len(latlon) else 0.0
+        self.kx, self.ky = equirect_scale(self.ref_lat)
+        x = latlon[:, 1] * self.kx
+        y = latlon[:, 0] * self.ky
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        self.src: List[int] = src.tolist()
+        self.dst: List[int] = dst.tolist()
+        self.ax, self.ay = x[src].tolist(), y[src].tolist()
+        self.bx, self.by = x[dst].tolist(), y[dst].tolist()
+        lo_x, hi_x = np.minimum(x[src], x[dst]), np.maximum(x[src], x[dst])
+        lo_y, hi_y = np.minimum(y[src], y[dst]), np.maximum(y[src], y[dst])
+        if len(src):
+            self.x0, self.y0 = float(lo_x.min()), float(lo_y.min())
+            if cell_m is None:
+                # about one segment per cell, unless the segments are very short
+                width, height = float(hi_x.max()) - self.x0, float(hi_y.max()) - self.y0
+                cell_m = max(float(np.median(np.hypot(hi_x - lo_x, hi_y - lo_y))), _cell_size(width, height, len(src)))
+        else:
+            self.x0 = self.y0 = 0.0
+        self.cell_m = max(cell_m or 1.0, 1.0)
+        cx0 = ((lo_x - self.x0) // self.cell_m).astype(np.int64)
+        cx1 = ((hi_x - self.x0) // self.cell_m).astype(np.int64)
+        cy0 = ((lo_y - self.y0) // self.cell_m).astype(np.int64)
+        cy1 = ((hi_y - self.y0) // self.cell_m).astype(np.int64)
+        self.nx = int(cx1.max()) + 1 if len(src) else 1
+        self.ny = int(cy1.max()) + 1 if len(src) else 1
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, (a, b, c, d) in enumerate(zip(cx0.tolist(), cx1.tolist(), cy0.tolist(), cy1.tolist())):
+            for gx in range(a, b + 1):
+                for gy in range(c, d + 1):
+                    self.cells.setdefault((gx, gy), []).append(i)
+
+    def __len__(self):
+        return len(self.src)
+
+    def nearest(self, lat: float, lon: float) -> Optional[Tuple[float, int, float, float, float]]:
+        """
+        The closest segment as (distance_m, segment, t, lat, lon): `t` is the
+        fraction along src -> dst of the closest point, which is (lat, lon).
+        """
+        if not self.src:
+            return None
+        qx, qy = lon * self.kx, lat * self.ky
+        cell = self.cell_m
+        cx = min(max(int((qx - self.x0) // cell), 0), self.nx - 1)
+        cy = min(max(int((qy - self.y0) // cell), 0), self.ny - 1)
+        slack = math.hypot(qx - (self.x0 + (cx + 0.5) * cell), qy - (self.y0 + (cy + 0.5) * cell)) - 0.5 * cell
+        max_r = max(cx, self.nx - 1 - cx, cy, self.ny - 1 - cy)
+        best_d2, best = math.inf, None
+        seen = set()
+        ax, ay, bx, by, cells = self.ax, self.ay, self.bx, self.by, self.cells
+        for r in range(max_r + 1):
+            for key in _ring(cx, cy, r, self.nx, self.ny):
+                for i in cells.get(key, ()):
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    dx, dy = bx[i] - ax[i], by[i] - ay[i]
+                    length2 = dx * dx + dy * dy
+                    t = ((qx - ax[i]) * dx + (qy - ay[i]) * dy) / length2 if length2 else 0.0
+                    t = min(max(t, 0.0), 1.0)
+                    px, py = ax[i] + t * dx, ay[i] + t * dy
+                    d2 = (px - qx) ** 2 + (py - qy) ** 2
+                    if d2 < best_d2:
+                        best_d2, best = d2, (i, t, px, py)
+            if best is not None:
+                bound = r * cell - slack
+                if bound > 0 and bound * bound >= best_d2:
+                    break
+        i, t, px, py = best
+        return math.sqrt(best_d2), i, t, py / self.ky, px / self.kx
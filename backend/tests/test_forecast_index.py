@@ -0,0 +1,60 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from backend.forecast_store import SLOTS_PER_DAY, ForecastIndex
+
+START = date(2025, 9, 7)
+STRUCTURES = ["Nutwood Structure", "LotA&G"]
+
+
+def forecast(days=14, skip_days=(), skip_slots=()):
+    """forecast.json for `days` days where availability is 1000 * day + slot."""
+    data = {}
+    for d in range(days):
+        if d in skip_days:
+            continue
+        slots = {}
+        for s in range(SLOTS_PER_DAY):
+            if (d, s) in skip_slots:
+                continue
+            slots[f"{s * 5 // 60:02d}:{s * 5 % 60:02d}:00"] = {name: 1000 * d + s + i for i, name in enumerate(STRUCTURES)}
+        data[(START + timedelta(days=d)).isoformat()] = slots
+    return data
+
+
+def at(day, hour=0, minute=0, second=0):
+    return datetime.combine(START + timedelta(days=day), datetime.min.time()).replace(hour=hour, minute=minute, second=second)
+
+
+def test_lookup_interpolates_between_slots_and_over_midnight():
+    index = ForecastIndex.from_json(forecast())
+    assert index.value(at(2, 1, 0), "nutwood") == 2000 + 12
+    assert index.value(at(2, 1, 2, 30), "Nutwood Structure") == 2000 + 12.5
+    assert index.value(at(2, 23, 57, 30), "lotAG") == (2000 + 287 + 1 + 3000 + 1) / 2
+
+
+def test_missing_day_borrows_the_same_weekday():
+    index = ForecastIndex.from_json(forecast(skip_days={3}))
+    assert index.value(at(3, 2, 0), "nutwood") == 10000 + 24
+    assert not np.isnan(index.values).any()
+
+
+def test_missing_slots_are_interpolated():
+    index = ForecastIndex.from_json(forecast(skip_slots={(5, 100), (5, 101), (5, 102)}))
+    assert index.value(at(5, 8, 25), "nutwood") == 5000 + 101
+    assert not np.isnan(index.values).any()
+
+
+def test_out_of_horizon_dates_use_the_nearest_forecast_week():
+    index = ForecastIndex.from_json(forecast())
+    assert index.value(at(14, 6, 0), "nutwood") == index.value(at(7, 6, 0), "nutwood")
+    assert index.value(at(30, 6, 0), "nutwood") == index.value(at(9, 6, 0), "nutwood")
+    assert index.value(at(-1, 6, 0), "nutwood") == index.value(at(6, 6, 0), "nutwood")
+    assert index.value(at(-10, 6, 0), "nutwood") == index.value(at(4, 6, 0), "nutwood")
+
+
+def test_short_forecast_clamps_to_its_ends():
+    index = ForecastIndex.from_json(forecast(days=3))
+    assert index.value(at(10, 6, 0), "nutwood") == index.value(at(2, 6, 0), "nutwood")
+    assert index.value(at(-4, 6, 0), "nutwood") == index.value(at(0, 6, 0), "nutwood")
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from backend.route_cache import RouteCache
+
+
+class Upstream:
+    """A fetch that counts its calls and finishes when `release` is set."""
+
+    def __init__(self, result="route", error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def main():
+        cache, upstream = RouteCache(), Upstream()
+        waiters = [asyncio.ensure_future(cache.get_or_fetch("k", upstream)) for _ in range(5)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        assert await asyncio.gather(*waiters) == ["route"] * 5
+        assert upstream.calls == 1
+        assert await cache.get_or_fetch("k", upstream) == "route"
+        assert upstream.calls == 1
+        assert (cache.misses, cache.coalesced, cache.hits) == (1, 4, 1)
+
+    asyncio.run(main())
+
+
+def test_cancelling_the_first_caller_leaves_the_fetch_running():
+    async def main():
+        cache, upstream = RouteCache(), Upstream()
+        first = asyncio.ensure_future(cache.get_or_fetch("k", upstream))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_fetch("k", upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        upstream.release.set()
+        assert await second == "route"
+        assert first.cancelled()
+        assert upstream.calls == 1
+        assert cache.stats()["entries"] == 1
+
+    asyncio.run(main())
+
+
+def test_failures_are_not_cached():
+    async def main():
+        cache, upstream = RouteCache(), Upstream(error=RuntimeError("upstream down"))
+        upstream.release.set()
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.get_or_fetch("k", upstream)
+        assert upstream.calls == 2
+        assert cache.stats()["entries"] == 0
+
+    asyncio.run(main())
+
+
+def test_expired_entries_are_fetched_again():
+    async def main():
+        cache, upstream = RouteCache(ttl=0), Upstream()
+        upstream.release.set()
+        await cache.get_or_fetch("k", upstream)
+        await cache.get_or_fetch("k", upstream)
+        assert upstream.calls == 2
+
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from backend.landmarks import build_landmarks
+from backend.walk_engine import WalkEngine
+from backend.walk_graph import build_arrays
+
+
+def engine_for(nodes, k=4, landmarks=0):
+    engine = WalkEngine([r[0] for r in nodes], [(r[1], r[2]) for r in nodes], **build_arrays(nodes, k))
+    if landmarks:
+        engine.set_landmarks(**build_landmarks(engine, landmarks))
+    return engine
+
+
+@pytest.fixture(scope="module")
+def nodes():
+    rng = random.Random(2)
+    return [[f"N{i}", 33.870 + rng.random() * 0.02, -117.900 + rng.random() * 0.02] for i in range(600)]
+
+
+def test_alt_finds_paths_of_the_same_cost(nodes):
+    plain, alt = engine_for(nodes), engine_for(nodes, landmarks=6)
+    rng = random.Random(3)
+    for _ in range(100):
+        a, b = rng.randrange(len(nodes)), rng.randrange(len(nodes))
+        p, q = plain.shortest_path(a, b), alt.shortest_path(a, b)
+        assert (p is None) == (q is None)
+        if p is not None:
+            assert q.cost == pytest.approx(p.cost, abs=1e-6)
+
+
+def test_alt_point_queries_match_plain_a_star(nodes):
+    plain, alt = engine_for(nodes), engine_for(nodes, landmarks=6)
+    rng = random.Random(4)
+    point = lambda: (33.870 + rng.random() * 0.02, -117.900 + rng.random() * 0.02)
+    for _ in range(100):
+        a, b = point(), point()
+        p = plain.shortest_path_between(plain.snap(*a), plain.snap(*b))
+        q = alt.shortest_path_between(alt.snap(*a), alt.snap(*b))
+        assert (p is None) == (q is None)
+        if p is not None:
+            assert q.cost == pytest.approx(p.cost, abs=1e-6)
+
+
+def test_disconnected_pairs_are_rejected():
+    # two clusters far enough apart that no kNN edge joins them
+    west = [[f"W{i}", 33.870 + i * 1e-4, -117.900] for i in range(5)]
+    east = [[f"E{i}", 33.870 + i * 1e-4, -117.800] for i in range(5)]
+    engine = engine_for(west + east, k=2)
+    assert not engine.reachable(0, 5)
+    assert engine.shortest_path(0, 5) is None
+    assert engine.one_to_many(0, [1, 5]).keys() == {1}
+    assert engine.shortest_path_between(engine.snap(33.870, -117.900), engine.snap(33.870, -117.800)) is None
@@ -0,0 +1,333 @@
+import heapq
+import time
+from math import hypot
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geo import equirect_scale
+from .spatial import SegmentIndex
+from .walk_graph import components
+
+# equirectangular distances can overshoot haversine by ~1e-4 across campus;
+# shrinking the estimate keeps the heuristic admissible
+HEURISTIC_SCALE = 0.999
+# ALT uses only the landmarks giving the tightest bounds at the source
+ACTIVE_LANDMARKS = 4
+
+
+class PathResult(NamedTuple):
+    nodes: List[int]
+    cost: float
+    expansions: int
+    elapsed_ms: float
+
+
+class EdgeSnap(NamedTuple):
+    """A point projected onto the edge u-v, `t` of the way from u to v."""
+    u: int
+    v: int
+    weight: float
+    t: float
+    lat: float
+    lon: float
+    distance_m: float
+
+
+class WalkEngine:
+    """
+    A* over the walking graph stored as CSR arrays with integer node ids.
+
+    `indptr`/`indices`/`weights` hold the adjacency, taken as built by
+    walk_graph.build_arrays (whose `dists` become `weights`) together with
+    its component labels, so neither is rebuilt here. The heuristic is the
+    straight-line distance on precomputed equirectangular coordinates, so a
+    push costs one hypot instead of six trig calls. The per-node g/parent/
+    closed buffers are allocated once and invalidated between queries with a
+    generation stamp instead of being cleared, which makes an engine
+    single-threaded: share it across coroutines on one event loop, not across
+    threads.
+    """
+
+    def __init__(self, ids: Sequence[str], coords: Sequence[Tuple[float, float]], indptr: np.ndarray,
+                 indices: np.ndarray, dists: np.ndarray, component: Optional[np.ndarray] = None):
+        self.ids = list(ids)
+        self.index = {node: i for i, node in enumerate(self.ids)}
+        n = len(self.ids)
+        latlon = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        self.coords: List[Tuple[float, float]] = [tuple(c) for c in latlon.tolist()]
+        self.kx, self.ky = equirect_scale(float(latlon[:, 0].mean()) if n else 0.0)
+        self.xy = np.column_stack((latlon[:, 1] * self.kx, latlon[:, 0] * self.ky)) * HEURISTIC_SCALE
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(dists, dtype=np.float64)
+
+        # labels of the undirected components: different labels means no path
+        # in either direction, so such queries are rejected without a search
+        if component is None:
+            component = components(n, np.repeat(np.arange(n), np.diff(self.indptr)), self.indices)
+        self.component = np.asarray(component)
+
+        # plain-list views of the arrays: element access on lists is several
+        # times cheaper than on ndarrays in the interpreter loop
+        self._indptr = self.indptr.tolist()
+        self._indices = self.indices.tolist()
+        self._weights = self.weights.tolist()
+        self._x = self.xy[:, 0].tolist()
+        self._y = self.xy[:, 1].tolist()
+        self._component = self.component.tolist()
+        self._g = [0.0] * n
+        self._parent = [-1] * n
+        self._seen = [0] * n
+        self._closed = [0] * n
+        self._stamp = 0
+        self.landmarks: Optional[List[int]] = None
+        self._lm_from: Optional[List[List[float]]] = None
+        self._lm_to: Optional[List[List[float]]] = None
+        self._edge_index: Optional[SegmentIndex] = None
+        self._edge_weights: Optional[List[float]] = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _next_stamp(self) -> int:
+        self._stamp += 1
+        return self._stamp
+
+    def set_landmarks(self, landmarks: np.ndarray, from_landmark: np.ndarray, to_landmark: np.ndarray):
+        """
+        Switches queries to ALT: the heuristic also takes the landmark
+        triangle-inequality bounds max(d(L,t) - d(L,v), d(v,L) - d(t,L)).
+        Tables are (landmarks, nodes) walking distances with unreachable
+        pairs clipped to a large finite value, which keeps every bound valid.
+        """
+        self.landmarks = np.asarray(landmarks).tolist()
+        self._lm_from = np.asarray(from_landmark, dtype=np.float64).tolist()
+        self._lm_to = np.asarray(to_landmark, dtype=np.float64).tolist()
+
+    def _node_landmarks(self, node: int):
+        """Walking distances from and to every landmark for a graph node."""
+        return [d[node] for d in self._lm_from], [d[node] for d in self._lm_to]
+
+    def _snap_landmarks(self, snap: EdgeSnap):
+        """
+        The same for a snapped point, reached through either end of its
+        edge: d(L,p) = min(d(L,u) + t*w, d(L,v) + (1-t)*w), and likewise
+        towards L. Exact on the symmetric graphs snapping assumes.
+        """
+        a, b = snap.t * snap.weight, (1 - snap.t) * snap.weight
+        return ([min(d[snap.u] + a, d[snap.v] + b) for d in self._lm_from],
+                [min(a + d[snap.u], b + d[snap.v]) for d in self._lm_to])
+
+    def _active_landmarks(self, source, target):
+        """
+        The ACTIVE_LANDMARKS landmarks with the tightest bound between
+        `source` and `target`, each given as (from, to) landmark distance
+        lists, as (d(L,t), d_from, d_to, d(t,L)) tuples for the heuristic.
+        """
+        bounds = []
+        for sf, st, tf, tt, d_from, d_to in zip(*source, *target, self._lm_from, self._lm_to):
+            bounds.append((max(tf - sf, st - tt), tf, d_from, d_to, tt))
+        bounds.sort(key=lambda b: b[0], reverse=True)
+        return [b[1:] for b in bounds[:ACTIVE_LANDMARKS]]
+
+    def reachable(self, source: int, target: int) -> bool:
+        return self._component[source] == self._component[target]
+
+    def shortest_path(self, source: int, target: int) -> Optional[PathResult]:
+        if not self.reachable(source, target):
+            return None
+        started = time.perf_counter()
+        stamp = self._next_stamp()
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        xs, ys = self._x, self._y
+        tx, ty = xs[target], ys[target]
+        active = ()
+        if self._lm_from is not None:
+            active = self._active_landmarks(self._node_landmarks(source), self._node_landmarks(target))
+
+        g[source] = 0.0
+        parent[source] = -1
+        seen[source] = stamp
+        heap = [(0.0, source)]
+        expansions = 0
+        while heap:
+            _, u = heapq.heappop(heap)
+            if closed[u] == stamp:
+                continue
+            if u == target:
+                path = [u]
+                while parent[u] != -1:
+                    u = parent[u]
+                    path.append(u)
+                path.reverse()
+                return PathResult(path, g[target], expansions, (time.perf_counter() - started) * 1e3)
+            closed[u] = stamp
+            expansions += 1
+            gu = g[u]
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                tg = gu + weights[e]
+                if seen[v] != stamp or tg < g[v]:
+                    seen[v] = stamp
+                    g[v] = tg
+                    parent[v] = u
+                    h = hypot(xs[v] - tx, ys[v] - ty)
+                    for tf, d_from, d_to, tt in active:
+                        b = tf - d_from[v]
+                        if b > h:
+                            h = b
+                        b = d_to[v] - tt
+                        if b > h:
+                            h = b
+                    heapq.heappush(heap, (tg + h, v))
+        return None
+
+    def one_to_many(self, source: int, targets: Sequence[int], paths: bool = False) -> Dict[int, Tuple[float, Optional[List[int]]]]:
+        """
+        Walking distance (and optionally the node path) from `source` to each
+        of `targets` with a single Dijkstra that stops once every reachable
+        target is settled. Targets in another component are left out.
+        """
+        pending = {t for t in targets if self.reachable(source, t)}
+        stamp = self._next_stamp()
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        g[source] = 0.0
+        parent[source] = -1
+        seen[source] = stamp
+        heap = [(0.0, source)]
+        found: Dict[int, Tuple[float, Optional[List[int]]]] = {}
+        while heap and pending:
+            d, u = heapq.heappop(heap)
+            if closed[u] == stamp:
+                continue
+            closed[u] = stamp
+            if u in pending:
+                pending.discard(u)
+                path = None
+                if paths:
+                    path = [u]
+                    while parent[path[-1]] != -1:
+                        path.append(parent[path[-1]])
+                    path.reverse()
+                found[u] = (d, path)
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                nd = d + weights[e]
+                if seen[v] != stamp or nd < g[v]:
+                    seen[v] = stamp
+                    g[v] = nd
+                    parent[v] = u
+                    heapq.heappush(heap, (nd, v))
+        return found
+
+    def build_edge_index(self):
+        """
+        Builds the segment index `snap` searches, one entry per undirected
+        edge stored as (u, v) with u < v; edges are taken as undirected,
+        which matches the symmetric graphs walk_graph builds. Call it before
+        serving, since building it costs far more than a query.
+        """
+        src = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+        dst = self.indices.astype(np.int64)
+        keep = src < dst
+        self._edge_index = SegmentIndex(self.coords, src[keep], dst[keep])
+        self._edge_weights = self.weights[keep].tolist()
+
+    def snap(self, lat: float, lon: float) -> Optional[EdgeSnap]:
+        """Projection of (lat, lon) onto the nearest edge, with u < v."""
+        if self._edge_index is None:
+            self.build_edge_index()
+        found = self._edge_index.nearest(lat, lon)
+        if found is None:
+            return None
+        distance_m, i, t, snap_lat, snap_lon = found
+        index = self._edge_index
+        return EdgeSnap(index.src[i], index.dst[i], self._edge_weights[i], t, snap_lat, snap_lon, distance_m)
+
+    def shortest_path_between(self, source: EdgeSnap, target: EdgeSnap) -> Optional[PathResult]:
+        """
+        A* between two points on edges. The snapped points act as virtual
+        nodes: the search starts from both ends of the source edge at their
+        partial-edge cost and finishes through either end of the target edge,
+        so the graph itself is never modified. `nodes` is the node path
+        between the two virtual nodes (empty when both lie on one edge and
+        walking along it is shortest). With landmarks set, the heuristic
+        takes the ALT bounds against the virtual target as well.
+        """
+        if not self.reachable(source.u, target.u):
+            return None
+        started = time.perf_counter()
+        stamp = self._next_stamp()
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        xs, ys = self._x, self._y
+        tx, ty = target.lon * self.kx * HEURISTIC_SCALE, target.lat * self.ky * HEURISTIC_SCALE
+        active = ()
+        if self._lm_from is not None:
+            active = self._active_landmarks(self._snap_landmarks(source), self._snap_landmarks(target))
+
+        best, best_node = float("inf"), None
+        # snaps always give an edge as u < v, so one edge compares equal in one orientation
+        if (source.u, source.v) == (target.u, target.v):
+            best, best_node = abs(source.t - target.t) * source.weight, -1
+        exits = {target.u: target.t * target.weight}
+        exits[target.v] = min(exits.get(target.v, float("inf")), (1 - target.t) * target.weight)
+
+        heap = []
+        for node, cost in ((source.u, source.t * source.weight), (source.v, (1 - source.t) * source.weight)):
+            if seen[node] != stamp or cost < g[node]:
+                seen[node] = stamp
+                g[node] = cost
+                parent[node] = -1
+                h = hypot(xs[node] - tx, ys[node] - ty)
+                for tf, d_from, d_to, tt in active:
+                    h = max(h, tf - d_from[node], d_to[node] - tt)
+                heapq.heappush(heap, (cost + h, node))
+        expansions = 0
+        while heap:
+            f, u = heapq.heappop(heap)
+            if f >= best:
+                break
+            if closed[u] == stamp:
+                continue
+            closed[u] = stamp
+            expansions += 1
+            gu = g[u]
+            if u in exits and gu + exits[u] < best:
+                best, best_node = gu + exits[u], u
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                tg = gu + weights[e]
+                if seen[v] != stamp or tg < g[v]:
+                    seen[v] = stamp
+                    g[v] = tg
+                    parent[v] = u
+                    h = hypot(xs[v] - tx, ys[v] - ty)
+                    for tf, d_from, d_to, tt in active:
+                        b = tf - d_from[v]
+                        if b > h:
+                            h = b
+                        b = d_to[v] - tt
+                        if b > h:
+                            h = b
+                    heapq.heappush(heap, (tg + h, v))
+        if best_node is None:
+            return None
+        path = []
+        u = best_node
+        while u != -1:
+            path.append(u)
+            u = parent[u]
+        path.reverse()
+        return PathResult(path, best, expansions, (time.perf_counter() - started) * 1e3)
+
+    def route(self, start: str, goal: str) -> Optional[List[str]]:
+        """Node-id path from `start` to `goal`, or None when unreachable."""
+        result = self.shortest_path(self.index[start], self.index[goal])
+        if result is None:
+            return None
+        return [self.ids[i] for i in result.nodes]
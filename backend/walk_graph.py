@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .geo import EARTH_RADIUS_M, equirect_scale
+
+CACHE_DIR = os.getenv("WALK_GRAPH_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".cache"))
+# bump when the construction below changes so stale artifacts are ignored
+GRAPH_FORMAT = 2
+CHUNK_ROWS = 512
+TIE_SLACK = 4
+
+Graph = Dict[str, List[Tuple[str, float]]]
+
+
+def haversine_pairs(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Element-wise (broadcasting) haversine distance in metres."""
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = np.radians(lat2 - lat1)
+    dlambda = np.radians(lon2 - lon1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def knn_arrays(node_array: Sequence[Sequence], k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices and haversine distances of each node's `k` nearest other nodes,
+    ordered by (distance, node id) like the original pure-Python construction.
+
+    Candidates are picked on the cheap equirectangular plane (k plus a few
+    spares, so near-ties survive the projection error) and only those are
+    measured with haversine. Rows are processed in chunks so memory stays
+    O(CHUNK_ROWS * n).
+    """
+    ids = [row[0] for row in node_array]
+    lat = np.array([row[1] for row in node_array], dtype=np.float64)
+    lon = np.array([row[2] for row in node_array], dtype=np.float64)
+    n = len(ids)
+    k = min(k, n - 1)
+    kk = min(k + TIE_SLACK, n - 1)
+    kx, ky = equirect_scale(float(lat.mean()))
+    x, y = lon * kx, lat * ky
+    # rank of each id in sorted order, used to break distance ties
+    id_rank = np.empty(n, dtype=np.int64)
+    id_rank[np.argsort(np.array(ids, dtype=object), kind="stable")] = np.arange(n)
+    neighbors = np.empty((n, k), dtype=np.int32)
+    dists = np.empty((n, k), dtype=np.float64)
+    for start in range(0, n, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, n)
+        rows = np.arange(stop - start)
+        d2 = (x[start:stop, None] - x[None, :]) ** 2 + (y[start:stop, None] - y[None, :]) ** 2
+        d2[rows, rows + start] = np.inf
+        cols = np.argpartition(d2, kk - 1, axis=1)[:, :kk] if kk < n - 1 else np.argsort(d2, axis=1)[:, :kk]
+        cd = haversine_pairs(lat[start:stop, None], lon[start:stop, None], lat[cols], lon[cols])
+        order = np.lexsort((id_rank[cols], cd), axis=-1)[:, :k]
+        neighbors[start:stop] = np.take_along_axis(cols, order, axis=1)
+        dists[start:stop] = np.take_along_axis(cd, order, axis=1)
+        if kk < n - 1:
+            # rows whose spare candidates all tie with the k-th one take the exact slow path
+            cand_d2 = np.take_along_axis(d2, cols, axis=1)
+            kth_d2 = np.take_along_axis(d2, neighbors[start:stop, -1:], axis=1)
+            for r in np.flatnonzero(cand_d2.max(axis=1) <= kth_d2[:, 0]):
+                tied = np.flatnonzero(d2[r] <= kth_d2[r, 0])
+                td = haversine_pairs(lat[start + r], lon[start + r], lat[tied], lon[tied])
+                exact = np.lexsort((id_rank[tied], td))[:k]
+                neighbors[start + r] = tied[exact]
+                dists[start + r] = td[exact]
+    return neighbors, dists
+
+
+def graph_key(node_array: Sequence[Sequence], k: int, bridge: bool = False) -> str:
+    payload = json.dumps([GRAPH_FORMAT, k, bridge, [list(row) for row in node_array]], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def components(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Connected-component label of every node, treating edges as undirected."""
+    parent = list(range(n))
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    for a, b in zip(src.tolist(), dst.tolist()):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    roots = np.array([find(a) for a in range(n)], dtype=np.int64)
+    return np.unique(roots, return_inverse=True)[1].astype(np.int32)
+
+
+def bridge_edges(lat: np.ndarray, lon: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Shortest straight connectors that join all components into one: the
+    smallest component is repeatedly linked to its nearest node outside it.
+    """
+    labels = labels.copy()
+    kx, ky = equirect_scale(float(lat.mean()))
+    x, y = lon * kx, lat * ky
+    src, dst = [], []
+    while True:
+        sizes = np.bincount(labels)
+        sizes[sizes == 0] = len(labels) + 1
+        if (sizes <= len(labels)).sum() <= 1:
+            break
+        c = int(np.argmin(sizes))
+        inside = np.flatnonzero(labels == c)
+        outside = np.flatnonzero(labels != c)
+        d2 = (x[inside, None] - x[None, outside]) ** 2 + (y[inside, None] - y[None, outside]) ** 2
+        i, j = np.unravel_index(np.argmin(d2), d2.shape)
+        a, b = int(inside[i]), int(outside[j])
+        src.append(a)
+        dst.append(b)
+        labels[labels == c] = labels[b]
+    src, dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+    return src, dst, haversine_pairs(lat[src], lon[src], lat[dst], lon[dst])
+
+
+def build_arrays(node_array: Sequence[Sequence], k: int, bridge: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Symmetric k-nearest-neighbour walking graph as CSR arrays plus component
+    labels. Every kNN edge is added in both directions, so reachability is
+    exactly "same component". With `bridge`, components are first joined by
+    their shortest straight connectors, leaving a single component.
+    """
+    ids = [row[0] for row in node_array]
+    n = len(ids)
+    lat = np.array([row[1] for row in node_array], dtype=np.float64)
+    lon = np.array([row[2] for row in node_array], dtype=np.float64)
+    neighbors, dists = knn_arrays(node_array, k)
+    rows = np.repeat(np.arange(n, dtype=np.int64), neighbors.shape[1])
+    cols = neighbors.ravel().astype(np.int64)
+    src, dst, w = np.concatenate([rows, cols]), np.concatenate([cols, rows]), np.concatenate([dists.ravel()] * 2)
+    labels = components(n, src, dst)
+    if bridge:
+        bsrc, bdst, bw = bridge_edges(lat, lon, labels)
+        src, dst, w = np.concatenate([src, bsrc, bdst]), np.concatenate([dst, bdst, bsrc]), np.concatenate([w, bw, bw])
+        labels = np.zeros(n, dtype=np.int32)
+    # one edge per ordered pair; each row ordered by (distance, neighbour id)
+    id_rank = np.empty(n, dtype=np.int64)
+    id_rank[np.argsort(np.array(ids, dtype=object), kind="stable")] = np.arange(n)
+    order = np.lexsort((id_rank[dst], w, src))
+    src, dst, w = src[order], dst[order], w[order]
+    first = np.sort(np.unique(src * n + dst, return_index=True)[1])
+    src, dst, w = src[first], dst[first], w[first]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return {"indptr": indptr, "indices": dst.astype(np.int32), "dists": w, "component": labels}
+
+
+def to_graph(node_array: Sequence[Sequence], indptr: np.ndarray, indices: np.ndarray, dists: np.ndarray, **_) -> Graph:
+    ids = [row[0] for row in node_array]
+    indptr, indices, dists = indptr.tolist(), indices.tolist(), dists.tolist()
+    return {
+        ids[i]: [(ids[indices[e]], dists[e]) for e in range(indptr[i], indptr[i + 1])]
+        for i in range(len(ids))
+    }
+
+
+def cached_arrays(path: str, build: Callable[[], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Arrays stored in the .npz at `path`, or `build()`'s arrays written there
+    atomically (temp file + rename) when it is missing or unreadable. An
+    unwritable cache directory only costs the rebuild.
+    """
+    try:
+        with np.load(path) as artifact:
+            return {name: artifact[name] for name in artifact.files}
+    except (OSError, KeyError, ValueError):
+        pass
+    arrays = build()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npz.tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return arrays
+
+
+def load_or_build(node_array: Sequence[Sequence], k: int = 4, cache_dir: str = CACHE_DIR, bridge: bool = False) -> Dict[str, np.ndarray]:
+    """
+    build_arrays' CSR arrays and component labels for `node_array`, read
+    from `cache_dir/walk_graph-<key>.npz` when a build for the same nodes,
+    `k` and `bridge` exists, otherwise built and cached there.
+    """
+    key = graph_key(node_array, k, bridge)
+    return cached_arrays(os.path.join(cache_dir, f"walk_graph-{key}.npz"), lambda: build_arrays(node_array, k, bridge))